@@ -4,7 +4,81 @@ LLM Provider Adapters for different cloud providers and local LLMs
 import httpx
 from typing import List, Dict, Optional
 from abc import ABC, abstractmethod
+import asyncio
 import json
+import logging
+import threading
+
+# boto3 is only needed for AWS Bedrock; import it once here rather than in every call
+try:
+    import boto3
+    from botocore.config import Config
+except ImportError:
+    boto3 = None
+    Config = None
+
+logger = logging.getLogger(__name__)
+
+# Transient failures are retried with exponential backoff before an LLM call fails.
+# Read timeouts are not retried since a single LLM call can legitimately run for minutes,
+# and neither is a 500, since the generation may already have run (and been billed).
+MAX_RETRIES = 3
+RETRY_BACKOFF_BASE = 0.5  # seconds
+RETRY_BACKOFF_MAX = 4.0  # seconds
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+RETRYABLE_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+async def _post_with_retry(client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+    """POST to the LLM API, retrying connection errors and throttling/unavailable responses"""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await client.post(url, **kwargs)
+        except RETRYABLE_EXCEPTIONS:
+            if attempt == MAX_RETRIES:
+                raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+        await asyncio.sleep(min(RETRY_BACKOFF_BASE * 2 ** attempt, RETRY_BACKOFF_MAX))
+
+
+# Shared HTTP clients keyed by timeout, so pooled keep-alive connections (and
+# their TLS sessions) survive between LLM calls instead of being torn down
+# after each one. A client is bound to the event loop it was created on.
+_http_clients: Dict[float, tuple] = {}
+_http_clients_lock = threading.Lock()
+
+
+def _get_http_client(timeout: float) -> httpx.AsyncClient:
+    """Get the shared AsyncClient for a timeout, creating it on first use in the running loop"""
+    loop = asyncio.get_running_loop()
+    with _http_clients_lock:
+        entry = _http_clients.get(timeout)
+        if entry is not None and entry[0] is loop and not entry[1].is_closed:
+            return entry[1]
+        client = httpx.AsyncClient(timeout=timeout)
+        _http_clients[timeout] = (loop, client)
+
+    # Release the connection pool of the client being replaced (a client whose
+    # loop has already stopped can no longer be awaited and is left to GC)
+    if entry is not None:
+        old_loop, old_client = entry
+        if old_loop is loop:
+            loop.create_task(old_client.aclose())
+        elif old_loop.is_running():
+            asyncio.run_coroutine_threadsafe(old_client.aclose(), old_loop)
+    return client
+
+
+async def close_http_clients():
+    """Close the shared HTTP clients created on the running loop (called on app shutdown)"""
+    loop = asyncio.get_running_loop()
+    with _http_clients_lock:
+        timeouts = [t for t, (client_loop, _) in _http_clients.items() if client_loop is loop]
+        clients = [_http_clients.pop(t)[1] for t in timeouts]
+    for client in clients:
+        await client.aclose()
 
 
 class BaseLLMProvider(ABC):
@@ -43,10 +117,10 @@ class LocalLLMProvider(BaseLLMProvider):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(self.api_url, json=payload, headers=headers)
-                response.raise_for_status()
-                return {"status": "Success", "response": response.json()}
+            client = _get_http_client(30.0)
+            response = await client.post(self.api_url, json=payload, headers=headers)
+            response.raise_for_status()
+            return {"status": "Success", "response": response.json()}
         except Exception as e:
             return {"status": "Failed", "error": str(e)}
 
@@ -63,16 +137,16 @@ class LocalLLMProvider(BaseLLMProvider):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(self.api_url, json=payload, headers=headers)
-                response.raise_for_status()
-                result = response.json()
+            client = _get_http_client(self.timeout)
+            response = await _post_with_retry(client, self.api_url, json=payload, headers=headers)
+            response.raise_for_status()
+            result = response.json()
 
-                content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                if not content:
-                    raise Exception("No content in LLM response")
+            content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+            if not content:
+                raise Exception("No content in LLM response")
 
-                return content
+            return content
         except httpx.TimeoutException:
             raise Exception(f"LLM request timed out after {self.timeout} seconds")
         except httpx.HTTPError as e:
@@ -100,6 +174,8 @@ class AWSBedrockProvider(BaseLLMProvider):
         self.timeout = timeout
         self.thinking_mode = thinking_mode  # For Claude Sonnet: enabled, disabled
         self._client = None
+        # Lowercased once for the per-call model family checks
+        self._model_id_lower = (model_id or "").lower()
 
     def _reset_client(self):
         """Reset the cached client to force recreation with new settings"""
@@ -108,38 +184,35 @@ class AWSBedrockProvider(BaseLLMProvider):
     def _get_client(self):
         """Lazy initialization of boto3 client"""
         if self._client is None:
-            try:
-                import boto3
-                from botocore.config import Config
-                
-                # Configure timeout - longer for thinking mode since it can take much longer
-                # Default boto3 read timeout is 60s, which is too short for thinking mode
-                # With thinking mode and max_tokens=20000, requests can take 15-20 minutes
-                read_timeout = 1200 if self.thinking_mode == "enabled" else 180  # 20 min for thinking, 3 min otherwise
-                
-                config = Config(
-                    read_timeout=read_timeout,
-                    retries={'max_attempts': 3}
-                )
-                
-                self._client = boto3.client(
-                    'bedrock-runtime',
-                    region_name=self.region,
-                    aws_access_key_id=self.access_key_id,
-                    aws_secret_access_key=self.secret_access_key,
-                    config=config,
-                    verify=False  # As per bedrock_access_guide.md
-                )
-            except ImportError:
+            if boto3 is None:
                 raise Exception("boto3 is not installed. Install it with: pip install boto3")
+
+            # Configure timeout - longer for thinking mode since it can take much longer
+            # Default boto3 read timeout is 60s, which is too short for thinking mode
+            # With thinking mode and max_tokens=20000, requests can take 15-20 minutes
+            read_timeout = 1200 if self.thinking_mode == "enabled" else 180  # 20 min for thinking, 3 min otherwise
+            
+            config = Config(
+                read_timeout=read_timeout,
+                retries={'max_attempts': 3, 'mode': 'adaptive'},
+                max_pool_connections=50
+            )
+            
+            self._client = boto3.client(
+                'bedrock-runtime',
+                region_name=self.region,
+                aws_access_key_id=self.access_key_id,
+                aws_secret_access_key=self.secret_access_key,
+                config=config,
+                verify=False  # As per bedrock_access_guide.md
+            )
         return self._client
 
     async def test_connection(self) -> Dict:
         """Test connection to AWS Bedrock"""
         try:
-            import asyncio
-            import boto3
-            from botocore.config import Config
+            if boto3 is None:
+                raise Exception("boto3 is not installed. Install it with: pip install boto3")
 
             # Use a short timeout specifically for connection testing (30 seconds like other providers)
             # This is separate from the main client's timeout used for regular calls
@@ -183,31 +256,33 @@ class AWSBedrockProvider(BaseLLMProvider):
     async def call_llm(self, messages: List[Dict], max_tokens: int = 500) -> str:
         """Call AWS Bedrock API"""
         try:
-            import asyncio
-            import logging
-            logger = logging.getLogger(__name__)
-            
-            logger.info(f"AWS Bedrock call_llm - Model: {self.model_id}, Region: {self.region}, Messages: {len(messages)}, Max Tokens: {max_tokens}, Thinking Mode: {self.thinking_mode}")
+            logger.info("AWS Bedrock call_llm - Model: %s, Region: %s, Messages: %d, Max Tokens: %s, Thinking Mode: %s",
+                        self.model_id, self.region, len(messages), max_tokens, self.thinking_mode)
             
             client = self._get_client()
 
             # Prepare request body based on model type
             body = self._prepare_request_body(messages, max_tokens)
             
-            logger.debug(f"AWS Bedrock request body prepared - Max Tokens: {body.get('max_tokens', 'N/A')}, Thinking: {body.get('thinking', 'N/A')}")
+            logger.debug("AWS Bedrock request body prepared - Max Tokens: %s, Thinking: %s",
+                         body.get('max_tokens', 'N/A'), body.get('thinking', 'N/A'))
 
             # Run synchronous boto3 call in executor to avoid blocking event loop
             # and ensure timeout configuration is respected
+            # self.timeout bounds the whole call, including boto3's own retries
             loop = asyncio.get_event_loop()
             logger.info("Calling AWS Bedrock invoke_model...")
-            response = await loop.run_in_executor(
-                None,
-                lambda: client.invoke_model(
-                    modelId=self.model_id,
-                    body=json.dumps(body),
-                    contentType='application/json',  # As per bedrock_access_guide.md
-                    accept='application/json'  # As per bedrock_access_guide.md
-                )
+            response = await asyncio.wait_for(
+                loop.run_in_executor(
+                    None,
+                    lambda: client.invoke_model(
+                        modelId=self.model_id,
+                        body=json.dumps(body),
+                        contentType='application/json',  # As per bedrock_access_guide.md
+                        accept='application/json'  # As per bedrock_access_guide.md
+                    )
+                ),
+                timeout=self.timeout
             )
             
             logger.info("AWS Bedrock invoke_model completed, parsing response...")
@@ -215,19 +290,20 @@ class AWSBedrockProvider(BaseLLMProvider):
             # Parse response based on model type
             response_body = json.loads(response['body'].read())
             content = self._extract_content(response_body)
-            logger.info(f"AWS Bedrock call_llm completed successfully - Response length: {len(content)} chars")
+            logger.info("AWS Bedrock call_llm completed successfully - Response length: %d chars", len(content))
             return content
 
+        except asyncio.TimeoutError:
+            logger.error("AWS Bedrock request timed out after %s seconds", self.timeout)
+            raise Exception(f"AWS Bedrock request timed out after {self.timeout} seconds")
         except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"AWS Bedrock API Error: {str(e)}", exc_info=True)
+            logger.error("AWS Bedrock API Error: %s", e, exc_info=True)
             raise Exception(f"AWS Bedrock API Error: {str(e)}")
 
     def _prepare_request_body(self, messages: List[Dict], max_tokens: int) -> Dict:
         """Prepare request body based on model type"""
         # For Anthropic Claude models on Bedrock
-        if "anthropic.claude" in self.model_id.lower():
+        if "anthropic.claude" in self._model_id_lower:
             # Convert messages to Claude format
             system_msg = ""
             user_messages = []
@@ -272,7 +348,7 @@ class AWSBedrockProvider(BaseLLMProvider):
             return body
 
         # For Amazon Titan models
-        elif "amazon.titan" in self.model_id.lower():
+        elif "amazon.titan" in self._model_id_lower:
             # Combine messages into a single prompt
             prompt = "\n".join([f"{msg['role']}: {msg['content']}" for msg in messages])
             return {
@@ -284,7 +360,7 @@ class AWSBedrockProvider(BaseLLMProvider):
             }
 
         # For AI21 Jurassic models
-        elif "ai21" in self.model_id.lower():
+        elif "ai21" in self._model_id_lower:
             prompt = "\n".join([f"{msg['role']}: {msg['content']}" for msg in messages])
             return {
                 "prompt": prompt,
@@ -303,21 +379,21 @@ class AWSBedrockProvider(BaseLLMProvider):
     def _extract_content(self, response_body: Dict) -> str:
         """Extract content from response based on model type"""
         # For Anthropic Claude models
-        if "anthropic.claude" in self.model_id.lower():
+        if "anthropic.claude" in self._model_id_lower:
             content_items = response_body.get("content", [])
             if content_items and len(content_items) > 0:
                 return content_items[0].get("text", "")
             raise Exception("No content in Bedrock response")
 
         # For Amazon Titan models
-        elif "amazon.titan" in self.model_id.lower():
+        elif "amazon.titan" in self._model_id_lower:
             results = response_body.get("results", [])
             if results and len(results) > 0:
                 return results[0].get("outputText", "")
             raise Exception("No content in Bedrock response")
 
         # For AI21 models
-        elif "ai21" in self.model_id.lower():
+        elif "ai21" in self._model_id_lower:
             completions = response_body.get("completions", [])
             if completions and len(completions) > 0:
                 return completions[0].get("data", {}).get("text", "")
@@ -352,9 +428,14 @@ class AzureOpenAIProvider(BaseLLMProvider):
         self.timeout = timeout
         self.reasoning_effort = reasoning_effort
 
+        # Derived once here rather than on every call
+        self._url = f"{self.endpoint}/openai/deployments/{self.deployment_name}/chat/completions?api-version={self.api_version}"
+        # GPT-5 and O3 models don't support max_tokens
+        self._is_reasoning_model = bool(self.deployment_name) and self.deployment_name.startswith(('gpt-5', 'o3'))
+
     def _get_url(self) -> str:
-        """Construct the Azure OpenAI API URL"""
-        return f"{self.endpoint}/openai/deployments/{self.deployment_name}/chat/completions?api-version={self.api_version}"
+        """Get the Azure OpenAI API URL"""
+        return self._url
 
     async def test_connection(self) -> Dict:
         """Test connection to Azure OpenAI"""
@@ -363,16 +444,12 @@ class AzureOpenAIProvider(BaseLLMProvider):
             "api-key": self.api_key
         }
 
-        # Check if this is a GPT-5 or O3 model (doesn't support max_tokens)
-        is_gpt5_model = self.deployment_name and self.deployment_name.startswith('gpt-5')
-        is_o3_model = self.deployment_name and self.deployment_name.startswith('o3')
-        
         payload = {
             "messages": [{"role": "user", "content": "Hello, this is a test message."}]
         }
         
         # GPT-5 and O3 models don't support max_tokens
-        if not (is_gpt5_model or is_o3_model):
+        if not self._is_reasoning_model:
             payload["max_tokens"] = 10
         
         # Note: reasoning_effort parameter is not supported by all Azure OpenAI GPT-5 deployments
@@ -381,10 +458,10 @@ class AzureOpenAIProvider(BaseLLMProvider):
         #     payload["reasoning"] = {"effort": self.reasoning_effort}
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(self._get_url(), json=payload, headers=headers)
-                response.raise_for_status()
-                return {"status": "Success", "response": response.json()}
+            client = _get_http_client(30.0)
+            response = await client.post(self._get_url(), json=payload, headers=headers)
+            response.raise_for_status()
+            return {"status": "Success", "response": response.json()}
         except Exception as e:
             return {"status": "Failed", "error": str(e)}
 
@@ -413,17 +490,13 @@ class AzureOpenAIProvider(BaseLLMProvider):
                 "content": str(msg["content"])
             })
 
-        # Check if this is a GPT-5 model (doesn't support max_tokens, temperature, etc.)
-        is_gpt5_model = self.deployment_name and self.deployment_name.startswith('gpt-5')
-        is_o3_model = self.deployment_name and self.deployment_name.startswith('o3')
-        
         payload = {
             "messages": validated_messages
         }
         
         # GPT-5 and O3 models don't support standard parameters like max_tokens
         # For gpt-4o and other models, ensure max_tokens is within valid range
-        if not (is_gpt5_model or is_o3_model):
+        if not self._is_reasoning_model:
             # Azure OpenAI max_tokens range is typically 1-8192 for most models
             # gpt-4o supports up to 16384 tokens
             if max_tokens > 16384:
@@ -440,35 +513,34 @@ class AzureOpenAIProvider(BaseLLMProvider):
 
         try:
             # Log request details (sanitized) for debugging
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.debug(f"Azure OpenAI Request - URL: {self._get_url()}, Deployment: {self.deployment_name}, Messages: {len(validated_messages)}, Max Tokens: {payload.get('max_tokens', 'N/A (GPT-5/O3)')}")
+            logger.debug("Azure OpenAI Request - URL: %s, Deployment: %s, Messages: %d, Max Tokens: %s",
+                         self._get_url(), self.deployment_name, len(validated_messages), payload.get('max_tokens', 'N/A (GPT-5/O3)'))
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(self._get_url(), json=payload, headers=headers)
-                
-                # Capture detailed error response for debugging
-                if response.status_code != 200:
-                    error_detail = ""
-                    try:
-                        error_body = response.json()
-                        error_detail = error_body.get("error", {})
-                        if isinstance(error_detail, dict):
-                            error_detail = error_detail.get("message", str(error_detail))
-                        else:
-                            error_detail = str(error_detail)
-                    except:
-                        error_detail = response.text[:500] if response.text else "Unknown error"
-                    
-                    raise Exception(f"HTTP error calling Azure OpenAI: {response.status_code} {response.reason_phrase}. Error: {error_detail}")
+            client = _get_http_client(self.timeout)
+            response = await _post_with_retry(client, self._get_url(), json=payload, headers=headers)
+            
+            # Capture detailed error response for debugging
+            if response.status_code != 200:
+                error_detail = ""
+                try:
+                    error_body = response.json()
+                    error_detail = error_body.get("error", {})
+                    if isinstance(error_detail, dict):
+                        error_detail = error_detail.get("message", str(error_detail))
+                    else:
+                        error_detail = str(error_detail)
+                except:
+                    error_detail = response.text[:500] if response.text else "Unknown error"
                 
-                result = response.json()
+                raise Exception(f"HTTP error calling Azure OpenAI: {response.status_code} {response.reason_phrase}. Error: {error_detail}")
+            
+            result = response.json()
 
-                content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                if not content:
-                    raise Exception("No content in Azure OpenAI response")
+            content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+            if not content:
+                raise Exception("No content in Azure OpenAI response")
 
-                return content
+            return content
         except httpx.TimeoutException:
             raise Exception(f"Azure OpenAI request timed out after {self.timeout} seconds")
         except httpx.HTTPStatusError as e:
@@ -491,8 +563,40 @@ class AzureOpenAIProvider(BaseLLMProvider):
             raise Exception(f"Azure OpenAI API Error: {str(e)}")
 
 
+# Providers are cached per saved configuration so their clients (and the pooled
+# HTTPS connections behind them) are reused across calls instead of rebuilt.
+# One entry per config id, stamped with the row's updated_at: an edited config
+# replaces its entry, so stale providers (and their credentials) are not kept.
+_provider_cache: Dict[int, tuple] = {}
+_provider_cache_lock = threading.Lock()
+
+
 def get_llm_provider(config) -> BaseLLMProvider:
-    """Factory function to get the appropriate LLM provider based on config"""
+    """Get the LLM provider for a config, reusing a cached instance while the config is unchanged"""
+    config_id = getattr(config, 'id', None)
+    if config_id is None:
+        return _create_llm_provider(config)
+
+    stamp = getattr(config, 'updated_at', None)
+    with _provider_cache_lock:
+        entry = _provider_cache.get(config_id)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+    provider = _create_llm_provider(config)
+    with _provider_cache_lock:
+        _provider_cache[config_id] = (stamp, provider)
+    return provider
+
+
+def evict_llm_provider(config_id: int):
+    """Drop the cached provider for a config that was updated or deleted"""
+    with _provider_cache_lock:
+        _provider_cache.pop(config_id, None)
+
+
+def _create_llm_provider(config) -> BaseLLMProvider:
+    """Factory function to create the appropriate LLM provider based on config"""
     from .models import LLMProviderType
 
     if config.provider_type == LLMProviderType.LOCAL:
@@ -1,5 +1,6 @@
 import httpx
 from typing import List, Dict, Optional
+import asyncio
 import json
 from .llm_providers import get_llm_provider
 import re
@@ -37,6 +38,9 @@ class LLMService:
     MAX_TOKENS_PER_CHUNK = 5000
     MAX_CHARS_PER_CHUNK = MAX_TOKENS_PER_CHUNK * CHARS_PER_TOKEN  # ~20,000 chars
     LLM_TIMEOUT = 180.0  # 3 minutes
+    MAX_CONCURRENT_FACET_CALLS = 4
+    # A JSON block enclosed in ```json ... ```, possibly with text before or after it
+    JSON_BLOCK_PATTERN = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL)
 
     @staticmethod
     def _get_rag_context(dimension: str, survey_metrics: Optional[Dict] = None) -> str:
@@ -159,9 +163,7 @@ class LLMService:
         json_content = None
         markdown_content = response_text
 
-        # Regex to find a JSON block enclosed in ```json ... ```
-        # It handles potential text before or after the JSON block.
-        json_block_match = re.search(r"```json\s*(\{.*?\})\s*```", response_text, re.DOTALL)
+        json_block_match = LLMService.JSON_BLOCK_PATTERN.search(response_text)
 
         if json_block_match:
             json_string = json_block_match.group(1)
@@ -423,6 +425,46 @@ Questions and Responses:
                 "content": None
             }
 
+    @staticmethod
+    async def analyze_facets(
+        config,
+        facet_type: str,
+        facets: Dict[str, Dict],
+        timeout: float
+    ) -> Dict[str, Dict]:
+        """
+        Analyze several facets of the same type concurrently
+        Returns dict mapping facet name to its analyze_facet result
+        """
+        semaphore = asyncio.Semaphore(LLMService.MAX_CONCURRENT_FACET_CALLS)
+
+        async def analyze_one(facet_name: str, facet_data: Dict) -> Dict:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        LLMService.analyze_facet(config, facet_type, facet_name, facet_data),
+                        timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    return {
+                        "success": False,
+                        "error": f"Timed out after {timeout}s",
+                        "content": None
+                    }
+                except Exception as e:
+                    # A failing facet must not fail the rest of the batch
+                    return {
+                        "success": False,
+                        "error": str(e),
+                        "content": None
+                    }
+
+        facet_names = list(facets.keys())
+        results = await asyncio.gather(
+            *(analyze_one(name, facets[name]) for name in facet_names)
+        )
+        return dict(zip(facet_names, results))
+
     @staticmethod
     async def analyze_comments_sentiment(
         config,
@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from .database import engine, Base, SessionLocal
 from .routers import auth_router, customers, users, llm_config, survey, reports
 from . import models, auth
+from .llm_providers import close_http_clients
 import json
 import os
 
@@ -46,8 +47,8 @@ def initialize_database():
             if os.path.exists(questions_file):
                 print("[INIT] Loading questions from questions.json...")
                 try:
-                    with open(questions_file, 'r', encoding='utf-8') as f:
-                        questions_data = json.load(f)
+                    with open(questions_file, 'rb') as f:
+                        questions_data = json.loads(f.read())
                     
                     print(f"[INIT] Found {len(questions_data)} questions in file.")
                     
@@ -111,6 +112,11 @@ app.include_router(llm_config.router, prefix="/api/llm-config", tags=["llm-confi
 app.include_router(survey.router, prefix="/api/survey", tags=["survey"])
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled LLM HTTP connections"""
+    await close_http_clients()
+
 @app.get("/")
 def read_root():
     """Root endpoint - API health check"""
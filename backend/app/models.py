@@ -137,4 +137,9 @@ class SurveyResponse(Base):
     
     survey = relationship("Survey", back_populates="responses")
     user = relationship("User", back_populates="survey_responses")
-    question = relationship("Question")
\ No newline at end of file
+    question = relationship("Question")
+
+    # Ensure one response per user per question per survey
+    __table_args__ = (
+        UniqueConstraint('survey_id', 'user_id', 'question_id', name='uq_survey_user_question'),
+    )
\ No newline at end of file
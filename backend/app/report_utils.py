@@ -2,8 +2,11 @@ import os
 import json
 import logging
 import traceback
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Iterator
 from pathlib import Path
 from decimal import Decimal
 
@@ -50,20 +53,47 @@ DIMENSION_MAP = {
     "Overall": "overall"
 }
 
+# Filename-safe dimension names, for recognising already-mapped dimensions
+DIMENSION_FILENAMES = frozenset(v.lower() for v in DIMENSION_MAP.values())
+
+# Report output directories under the base path (one subdirectory per customer)
+MARKDOWN_REPORTS_DIR = os.path.join(REPORTS_BASE_PATH, "reports")
+JSON_REPORTS_DIR = os.path.join(REPORTS_BASE_PATH, "report_json")
+
 
 def get_dimension_filename(dimension: str) -> str:
     """Convert dimension name to filename-safe format with underscores"""
     # If dimension is already in the mapped format, use it
-    if dimension.lower() in [v.lower() for v in DIMENSION_MAP.values()]:
-        return dimension.lower()
+    dimension_lower = dimension.lower()
+    if dimension_lower in DIMENSION_FILENAMES:
+        return dimension_lower
 
     # Otherwise, look it up in the mapping
-    return DIMENSION_MAP.get(dimension, dimension.lower().replace(" ", "_").replace("&", ""))
+    return DIMENSION_MAP.get(dimension, dimension_lower.replace(" ", "_").replace("&", ""))
+
+
+@contextmanager
+def _atomic_write(path: str):
+    """
+    Open a temporary file next to path for writing and move it into place
+    only once the block completes, so an error part-way through never leaves
+    a truncated report behind in place of the previous one.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    f = open(tmp_path, 'x', encoding='utf-8')
+    try:
+        with f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 def check_reports_path_exists() -> bool:
     """Check if the reports base path exists"""
-    return os.path.exists(REPORTS_BASE_PATH) and os.path.isdir(REPORTS_BASE_PATH)
+    # isdir() is False for missing paths, so a single stat() covers both checks
+    return os.path.isdir(REPORTS_BASE_PATH)
 
 
 def get_report_paths(customer_code: str, dimension: str) -> Dict[str, str]:
@@ -80,8 +110,8 @@ def get_report_paths(customer_code: str, dimension: str) -> Dict[str, str]:
     dimension_filename = get_dimension_filename(dimension)
     date_str = datetime.now().strftime("%Y%m%d")
 
-    markdown_dir = os.path.join(REPORTS_BASE_PATH, "reports", customer_code)
-    json_dir = os.path.join(REPORTS_BASE_PATH, "report_json", customer_code)
+    markdown_dir = os.path.join(MARKDOWN_REPORTS_DIR, customer_code)
+    json_dir = os.path.join(JSON_REPORTS_DIR, customer_code)
 
     markdown_path = os.path.join(markdown_dir, f"{dimension_filename}_report_{date_str}.md")
     json_path = os.path.join(json_dir, f"{dimension_filename}_report_{date_str}.json")
@@ -94,7 +124,7 @@ def get_report_paths(customer_code: str, dimension: str) -> Dict[str, str]:
     }
 
 
-def create_markdown_report(
+def iter_markdown_report(
     dimension: str,
     customer_code: str,
     customer_name: str,
@@ -107,16 +137,17 @@ def create_markdown_report(
     comment_insights: Optional[Dict] = None,
     dimension_summaries: Optional[Dict] = None,
     overall_summary: Optional[str] = None
-) -> str:
+) -> Iterator[str]:
     """
-    Create a markdown report with questions table and scores
+    Generate a markdown report with questions table and scores section by section,
+    so it can be written to disk without holding the whole report in memory
 
-    Returns:
-        Markdown content as string
+    Yields:
+        Markdown content chunks
     """
     date_str = datetime.now().strftime("%Y-%m-%d")
 
-    markdown = f"""# {dimension} Report
+    yield f"""# {dimension} Report
 
 **Customer:** {customer_name} ({customer_code})
 **Date:** {date_str}
@@ -128,7 +159,7 @@ def create_markdown_report(
 
     # Add overall metrics for dimension reports
     if overall_metrics:
-        markdown += f"""## Overview
+        yield f"""## Overview
 
 - **Average Score:** {overall_metrics.get('avg_score', 'N/A')}
 - **Response Rate:** {overall_metrics.get('response_rate', 'N/A')}
@@ -141,7 +172,7 @@ def create_markdown_report(
 
     # Add overall summary for Overall reports
     if overall_summary:
-        markdown += f"""## Executive Summary
+        yield f"""## Executive Summary
 
 {overall_summary}
 
@@ -151,7 +182,7 @@ def create_markdown_report(
 
     # Add dimension-level analysis
     if dimension_analysis:
-        markdown += f"""## Strategic Analysis & Recommendations
+        yield f"""## Strategic Analysis & Recommendations
 
 {dimension_analysis}
 
@@ -161,11 +192,11 @@ def create_markdown_report(
 
     # Add dimension summaries for Overall reports
     if dimension_summaries:
-        markdown += """## Dimension Analysis
+        yield """## Dimension Analysis
 
 """
         for dim, summary in dimension_summaries.items():
-            markdown += f"""### {dim}
+            yield f"""### {dim}
 
 {summary}
 
@@ -175,7 +206,7 @@ def create_markdown_report(
 
     # Add category analysis
     if category_analysis and len(category_analysis) > 0:
-        markdown += """## Category Analysis
+        yield """## Category Analysis
 
 | Category | Avg Score | % High (8-10) | % Medium (5-7) | % Low (1-4) | Response Count |
 |----------|-----------|---------------|----------------|-------------|----------------|
@@ -195,13 +226,13 @@ def create_markdown_report(
 
             count = cat_data.get('count', 0)
 
-            markdown += f"| {cat_name} | {avg_score_str} | {pct_high_str} | {pct_medium_str} | {pct_low_str} | {count} |\n"
+            yield f"| {cat_name} | {avg_score_str} | {pct_high_str} | {pct_medium_str} | {pct_low_str} | {count} |\n"
 
-        markdown += "\n---\n\n"
+        yield "\n---\n\n"
 
     # Add process analysis
     if process_analysis and len(process_analysis) > 0:
-        markdown += """## Process Analysis
+        yield """## Process Analysis
 
 | Process | Avg Score | % High (8-10) | % Medium (5-7) | % Low (1-4) | Response Count |
 |---------|-----------|---------------|----------------|-------------|----------------|
@@ -221,13 +252,13 @@ def create_markdown_report(
 
             count = proc_data.get('count', 0)
 
-            markdown += f"| {proc_name} | {avg_score_str} | {pct_high_str} | {pct_medium_str} | {pct_low_str} | {count} |\n"
+            yield f"| {proc_name} | {avg_score_str} | {pct_high_str} | {pct_medium_str} | {pct_low_str} | {count} |\n"
 
-        markdown += "\n---\n\n"
+        yield "\n---\n\n"
 
     # Add lifecycle analysis
     if lifecycle_analysis and len(lifecycle_analysis) > 0:
-        markdown += """## Lifecycle Stage Analysis
+        yield """## Lifecycle Stage Analysis
 
 | Lifecycle Stage | Avg Score | % High (8-10) | % Medium (5-7) | % Low (1-4) | Response Count |
 |----------------|-----------|---------------|----------------|-------------|----------------|
@@ -247,13 +278,13 @@ def create_markdown_report(
 
             count = lc_data.get('count', 0)
 
-            markdown += f"| {lc_name} | {avg_score_str} | {pct_high_str} | {pct_medium_str} | {pct_low_str} | {count} |\n"
+            yield f"| {lc_name} | {avg_score_str} | {pct_high_str} | {pct_medium_str} | {pct_low_str} | {count} |\n"
 
-        markdown += "\n---\n\n"
+        yield "\n---\n\n"
 
     # Add comment insights
     if comment_insights and comment_insights.get('total_comments', 0) > 0:
-        markdown += f"""## Comment Analysis
+        yield f"""## Comment Analysis
 
 - **Total Comments:** {comment_insights.get('total_comments', 0)}
 - **Positive Comments:** {comment_insights.get('positive_count', 0)}
@@ -264,17 +295,17 @@ def create_markdown_report(
 """
 
         if comment_insights.get('llm_analysis'):
-            markdown += f"""### Sentiment & Themes Analysis
+            yield f"""### Sentiment & Themes Analysis
 
 {comment_insights['llm_analysis']}
 
 """
 
-        markdown += "---\n\n"
+        yield "---\n\n"
 
     # Add questions table
     if questions and len(questions) > 0:
-        markdown += """## Question-Level Details
+        yield """## Question-Level Details
 
 | Q# | Question | Category | Process | Lifecycle | Avg Score |
 |----|----------|----------|---------|-----------|-----------|
@@ -291,16 +322,14 @@ def create_markdown_report(
             # Escape pipe characters in the question text
             q_text = q_text.replace('|', '\\|')
 
-            markdown += f"| {q_id} | {q_text} | {category} | {process} | {lifecycle} | {avg_score_str} |\n"
+            yield f"| {q_id} | {q_text} | {category} | {process} | {lifecycle} | {avg_score_str} |\n"
 
-        markdown += "\n---\n\n"
+        yield "\n---\n\n"
 
-    markdown += f"""
+    yield f"""
 *Report generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}*
 """
 
-    return markdown
-
 
 def save_reports(
     customer_code: str,
@@ -330,7 +359,7 @@ def save_reports(
 
     # Check if base path exists
     if not check_reports_path_exists():
-        logger.warning(f"Reports base path {REPORTS_BASE_PATH} does not exist. Skipping report save.")
+        logger.warning("Reports base path %s does not exist. Skipping report save.", REPORTS_BASE_PATH)
         result["error"] = f"Reports path {REPORTS_BASE_PATH} not accessible"
         return result
 
@@ -341,8 +370,8 @@ def save_reports(
         os.makedirs(paths['markdown_dir'], exist_ok=True)
         os.makedirs(paths['json_dir'], exist_ok=True)
 
-        # Create markdown report
-        markdown_content = create_markdown_report(
+        # Stream the markdown report to a temp file section by section
+        markdown_chunks = iter_markdown_report(
             dimension=dimension,
             customer_code=customer_code,
             customer_name=customer_name,
@@ -358,10 +387,10 @@ def save_reports(
         )
 
         # Save markdown
-        with open(paths['markdown'], 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        with _atomic_write(paths['markdown']) as f:
+            f.writelines(markdown_chunks)
         result['markdown_path'] = paths['markdown']
-        logger.info(f"Saved markdown report to {paths['markdown']}")
+        logger.info("Saved markdown report to %s", paths['markdown'])
 
         # Create JSON report with full context
         json_data = {
@@ -374,18 +403,30 @@ def save_reports(
         }
 
         # Save JSON with custom encoder to handle datetime and other types
-        with open(paths['json'], 'w', encoding='utf-8') as f:
+        with _atomic_write(paths['json']) as f:
             json.dump(json_data, f, indent=2, ensure_ascii=False, cls=DateTimeEncoder)
         result['json_path'] = paths['json']
-        logger.info(f"Saved JSON report to {paths['json']}")
+        logger.info("Saved JSON report to %s", paths['json'])
 
     except Exception as e:
-        logger.error(f"Error saving reports: {str(e)}\n{traceback.format_exc()}")
+        logger.error("Error saving reports: %s\n%s", e, traceback.format_exc())
         result["error"] = str(e)
 
     return result
 
 
+@lru_cache(maxsize=32)
+def _load_report_json(json_path: str, mtime_ns: int, size: int) -> Dict:
+    """
+    Load a saved JSON report. Keyed on the file's mtime and size so a rewritten
+    report is re-read automatically. The returned dict is shared; do not mutate it.
+    The file is read as raw bytes; json.loads detects the UTF-8 encoding itself,
+    which skips the text-mode decoding layer.
+    """
+    with open(json_path, 'rb') as f:
+        return json.loads(f.read())
+
+
 def get_cached_report(customer_code: str, dimension: str, survey_updated_at: datetime) -> Optional[Dict]:
     """
     Get cached report if it exists and is newer than the survey update time
@@ -405,26 +446,26 @@ def get_cached_report(customer_code: str, dimension: str, survey_updated_at: dat
         paths = get_report_paths(customer_code, dimension)
         json_path = paths['json']
 
-        # Check if JSON report exists
-        if not os.path.exists(json_path):
-            logger.info(f"No cached report found at {json_path}")
+        # A single stat() both checks that the JSON report exists and gets its modification time
+        try:
+            file_stat = os.stat(json_path)
+        except FileNotFoundError:
+            logger.info("No cached report found at %s", json_path)
             return None
 
-        # Check file modification time
-        file_mtime = datetime.fromtimestamp(os.path.getmtime(json_path))
+        file_mtime = datetime.fromtimestamp(file_stat.st_mtime)
 
         # If survey was updated after report was generated, cache is stale
         if survey_updated_at and file_mtime < survey_updated_at:
-            logger.info(f"Cached report is stale (report: {file_mtime}, survey: {survey_updated_at})")
+            logger.info("Cached report is stale (report: %s, survey: %s)", file_mtime, survey_updated_at)
             return None
 
-        # Load and return cached report
-        with open(json_path, 'r', encoding='utf-8') as f:
-            cached_data = json.load(f)
+        # Load and return cached report (served from memory if unchanged on disk)
+        cached_data = _load_report_json(json_path, file_stat.st_mtime_ns, file_stat.st_size)
 
-        logger.info(f"Using cached report from {json_path}")
+        logger.info("Using cached report from %s", json_path)
         return cached_data.get('report_data')
 
     except Exception as e:
-        logger.error(f"Error loading cached report: {str(e)}")
+        logger.error("Error loading cached report: %s", e)
         return None
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from datetime import timedelta
 from .. import models, schemas, auth
 from ..database import get_db
+from .utils import json_response
 
 router = APIRouter()
 
@@ -41,13 +42,14 @@ def login(user_id: str, password: str, db: Session = Depends(get_db)):
     )
     
     # Convert user to schema
-    user_schema = schemas.User.from_orm(user)
+    user_schema = schemas.User.model_validate(user)
     
-    return {
+    token: schemas.Token = {
         "access_token": access_token,
         "token_type": "bearer",
         "user": user_schema
     }
+    return json_response(schemas.TOKEN_ADAPTER, token)
 
 @router.get("/me", response_model=schemas.UserWithCustomer)
 def get_current_user_info(
@@ -68,4 +70,4 @@ def get_current_user_info(
         models.User.id == current_user.id
     ).first()
     
-    return user
\ No newline at end of file
+    return json_response(schemas.UserWithCustomer, user)
\ No newline at end of file
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 from .. import models, schemas, auth
 from ..database import get_db
+from .utils import json_response
 
 router = APIRouter()
 
@@ -32,7 +33,7 @@ def create_customer(
     db.commit()
     db.refresh(db_customer)
     
-    return db_customer
+    return json_response(schemas.Customer, db_customer)
 
 @router.get("/", response_model=List[schemas.Customer])
 def list_customers(
@@ -49,7 +50,7 @@ def list_customers(
         models.Customer.is_deleted == False
     ).offset(skip).limit(limit).all()
     
-    return customers
+    return json_response(schemas.CUSTOMER_LIST_ADAPTER, customers)
 
 @router.get("/{customer_id}", response_model=schemas.Customer)
 def get_customer(
@@ -69,7 +70,7 @@ def get_customer(
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    return customer
+    return json_response(schemas.Customer, customer)
 
 @router.put("/{customer_id}", response_model=schemas.Customer)
 def update_customer(
@@ -97,7 +98,7 @@ def update_customer(
     db.commit()
     db.refresh(db_customer)
     
-    return db_customer
+    return json_response(schemas.Customer, db_customer)
 
 @router.delete("/{customer_id}")
 def delete_customer(
@@ -3,7 +3,9 @@ from sqlalchemy.orm import Session
 from typing import List
 from .. import models, schemas, auth
 from ..database import get_db
+from .utils import json_response
 from ..llm_service import LLMService
+from ..llm_providers import evict_llm_provider
 import logging
 
 router = APIRouter()
@@ -58,8 +60,9 @@ async def create_or_update_llm_config(
         
         db.commit()
         db.refresh(existing)
+        evict_llm_provider(existing.id)
         logger.info(f"Updated config: id={existing.id}, status={existing.status}")
-        return existing
+        return json_response(schemas.LLMConfig, existing)
     else:
         logger.info("Creating new config")
         # Ensure new configs always start with "Not Tested" status
@@ -70,7 +73,7 @@ async def create_or_update_llm_config(
         db.commit()
         db.refresh(db_config)
         logger.info(f"Created config: id={db_config.id}, status={db_config.status}")
-        return db_config
+        return json_response(schemas.LLMConfig, db_config)
 
 @router.get("/", response_model=List[schemas.LLMConfig])
 def list_llm_configs(
@@ -78,7 +81,7 @@ def list_llm_configs(
     current_user: models.User = Depends(auth.require_admin)
 ):
     configs = db.query(models.LLMConfig).all()
-    return configs
+    return json_response(schemas.LLM_CONFIG_LIST_ADAPTER, configs)
 
 @router.post("/{config_id}/test")
 async def test_llm_config(
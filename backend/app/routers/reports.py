@@ -14,6 +14,42 @@ from ..report_utils import save_reports, get_cached_report
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Common stop words left out of the comment word frequency analysis
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
+    'could', 'may', 'might', 'can', 'this', 'that', 'these', 'those',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what', 'which', 'who',
+    'when', 'where', 'why', 'how', 'not', 'no', 'yes',
+    # Additional stop words
+    'some', 'there', 'its', 'their', 'our', 'your', 'my', 'his', 'her',
+    'them', 'us', 'me', 'him', 'from', 'into', 'out', 'up', 'down',
+    'over', 'under', 'about', 'just', 'very', 'so', 'than', 'too',
+    'also', 'only', 'other', 'such', 'more', 'most', 'much', 'many',
+    'any', 'all', 'both', 'each', 'few', 'as', 'by', 'if', 'then',
+    'because', 'while', 'after', 'before', 'since', 'until', 'through',
+    'during', 'within', 'without', 'between', 'among'
+})
+
+# Keywords for the simple keyword-matching sentiment analysis of comments
+POSITIVE_KEYWORDS = frozenset({
+    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'awesome',
+    'strong', 'effective', 'efficient', 'helpful', 'useful', 'valuable', 'benefit',
+    'improved', 'improvement', 'better', 'best', 'well', 'clear', 'easy', 'simple',
+    'comprehensive', 'robust', 'reliable', 'satisfied', 'satisfaction', 'success',
+    'successful', 'positive', 'progress', 'advanced', 'quality', 'sound'
+})
+
+NEGATIVE_KEYWORDS = frozenset({
+    'poor', 'bad', 'terrible', 'awful', 'horrible', 'worst', 'weak', 'ineffective',
+    'inefficient', 'useless', 'lacking', 'missing', 'inadequate', 'insufficient',
+    'issue', 'issues', 'problem', 'problems', 'concern', 'concerns', 'challenge',
+    'challenges', 'difficulty', 'difficult', 'hard', 'complicated', 'complex',
+    'confusing', 'unclear', 'inconsistent', 'incomplete', 'limited', 'lack',
+    'need', 'needs', 'require', 'required', 'should', 'must', 'gap', 'gaps'
+})
+
 
 def aggregate_by_facet(
     facet_type: str,  # 'category', 'process', or 'lifecycle_stage'
@@ -136,90 +172,46 @@ def analyze_comments_basic(all_comments: List[str]) -> Dict:
             'negative_words': []
         }
 
-    # Word frequency analysis
-    # Remove common stop words
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-        'of', 'with', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-        'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
-        'could', 'may', 'might', 'can', 'this', 'that', 'these', 'those',
-        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what', 'which', 'who',
-        'when', 'where', 'why', 'how', 'not', 'no', 'yes',
-        # Additional stop words
-        'some', 'there', 'its', 'their', 'our', 'your', 'my', 'his', 'her',
-        'them', 'us', 'me', 'him', 'from', 'into', 'out', 'up', 'down',
-        'over', 'under', 'about', 'just', 'very', 'so', 'than', 'too',
-        'also', 'only', 'other', 'such', 'more', 'most', 'much', 'many',
-        'any', 'all', 'both', 'each', 'few', 'as', 'by', 'if', 'then',
-        'because', 'while', 'after', 'before', 'since', 'until', 'through',
-        'during', 'within', 'without', 'between', 'among'
-    }
-
     word_counter = Counter()
     total_length = 0
-    all_meaningful_words = []
+    positive_count = 0
+    negative_count = 0
+    neutral_count = 0
+    positive_comment_words = Counter()
+    negative_comment_words = Counter()
 
+    # Word frequency and sentiment are gathered in a single pass over the comments
     for comment in all_comments:
         total_length += len(comment)
-        # Simple word tokenization
+        # Simple word tokenization (lowercased once per comment)
         words = comment.lower().split()
         # Filter out stop words and short words
         meaningful_words = [
             w.strip('.,!?;:()[]{}"\'-')
             for w in words
-            if len(w) > 3 and w.lower() not in stop_words
+            if len(w) > 3 and w not in STOP_WORDS
         ]
         word_counter.update(meaningful_words)
-        all_meaningful_words.append(meaningful_words)
-
-    # Get top 20 words
-    top_words = dict(word_counter.most_common(20))
-
-    # Simple sentiment analysis using keyword matching
-    positive_keywords = {
-        'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'awesome',
-        'strong', 'effective', 'efficient', 'helpful', 'useful', 'valuable', 'benefit',
-        'improved', 'improvement', 'better', 'best', 'well', 'clear', 'easy', 'simple',
-        'comprehensive', 'robust', 'reliable', 'satisfied', 'satisfaction', 'success',
-        'successful', 'positive', 'progress', 'advanced', 'quality', 'sound'
-    }
-
-    negative_keywords = {
-        'poor', 'bad', 'terrible', 'awful', 'horrible', 'worst', 'weak', 'ineffective',
-        'inefficient', 'useless', 'lacking', 'missing', 'inadequate', 'insufficient',
-        'issue', 'issues', 'problem', 'problems', 'concern', 'concerns', 'challenge',
-        'challenges', 'difficulty', 'difficult', 'hard', 'complicated', 'complex',
-        'confusing', 'unclear', 'inconsistent', 'incomplete', 'limited', 'lack',
-        'need', 'needs', 'require', 'required', 'should', 'must', 'gap', 'gaps'
-    }
-
-    positive_count = 0
-    negative_count = 0
-    neutral_count = 0
-    positive_comment_words = Counter()
-    negative_comment_words = Counter()
 
-    for idx, comment in enumerate(all_comments):
-        comment_lower = comment.lower()
-        words_in_comment = set(comment_lower.split())
-
-        # Check for positive and negative keywords
-        has_positive = any(keyword in words_in_comment for keyword in positive_keywords)
-        has_negative = any(keyword in words_in_comment for keyword in negative_keywords)
+        # Check for positive and negative keywords (one set intersection test each)
+        words_in_comment = set(words)
+        has_positive = not POSITIVE_KEYWORDS.isdisjoint(words_in_comment)
+        has_negative = not NEGATIVE_KEYWORDS.isdisjoint(words_in_comment)
 
         if has_positive and not has_negative:
             positive_count += 1
             # Track words from positive comments
-            if idx < len(all_meaningful_words):
-                positive_comment_words.update(all_meaningful_words[idx])
+            positive_comment_words.update(meaningful_words)
         elif has_negative and not has_positive:
             negative_count += 1
             # Track words from negative comments
-            if idx < len(all_meaningful_words):
-                negative_comment_words.update(all_meaningful_words[idx])
+            negative_comment_words.update(meaningful_words)
         else:
             neutral_count += 1
 
+    # Get top 20 words
+    top_words = dict(word_counter.most_common(20))
+
     return {
         'total_comments': len(all_comments),
         'word_frequency': top_words,
@@ -268,8 +260,9 @@ def get_customers_with_surveys(
     # Debug: Log the results
     import logging
     logger = logging.getLogger(__name__)
-    logger.info(f"User {current_user.user_id} ({current_user.user_type}) - Found {len(result)} customers with surveys")
-    logger.info(f"Customers: {[c['name'] for c in result]}")
+    logger.info("User %s (%s) - Found %s customers with surveys",
+                current_user.user_id, current_user.user_type, len(result))
+    logger.info("Customers: %s", [c['name'] for c in result])
     
     return result
 
@@ -330,9 +323,12 @@ async def get_dimension_report(
 
     # Check for cached report if not forcing regeneration
     if not force_regenerate:
-        cached_report = get_cached_report(customer.customer_code, dimension, survey.updated_at)
+        # Run blocking file I/O off the event loop
+        cached_report = await asyncio.to_thread(
+            get_cached_report, customer.customer_code, dimension, survey.updated_at
+        )
         if cached_report:
-            logger.info(f"Returning cached report for {customer.customer_code}/{dimension}")
+            logger.info("Returning cached report for %s/%s", customer.customer_code, dimension)
             return cached_report
 
     questions = db.query(models.Question).filter(
@@ -432,18 +428,26 @@ async def get_dimension_report(
 
     # Log LLM config status for debugging
     if llm_config:
-        logger.info(f"LLM config found for dimension '{dimension}': status='{llm_config.status}', provider='{llm_config.provider_type}', model='{llm_config.azure_deployment_name if llm_config.provider_type == models.LLMProviderType.AZURE else (llm_config.aws_model_id if llm_config.provider_type == models.LLMProviderType.BEDROCK else llm_config.model_name)}'")
+        logger.info("LLM config found for dimension '%s': status='%s', provider='%s', model='%s'",
+                    dimension, llm_config.status, llm_config.provider_type,
+                    llm_config.azure_deployment_name if llm_config.provider_type == models.LLMProviderType.AZURE
+                    else (llm_config.aws_model_id if llm_config.provider_type == models.LLMProviderType.BEDROCK
+                          else llm_config.model_name))
         if llm_config.status != "Success":
-            logger.warning(f"LLM config status is '{llm_config.status}' - LLM analysis will be skipped. Please test the connection first.")
+            logger.warning("LLM config status is '%s' - LLM analysis will be skipped. Please test the connection first.",
+                           llm_config.status)
     else:
-        logger.warning(f"No LLM config found for dimension '{dimension}' - using Default config if available")
+        logger.warning("No LLM config found for dimension '%s' - using Default config if available", dimension)
+
+    # Read the config state once; it gates every LLM step below
+    llm_ready = llm_config is not None and llm_config.status == "Success"
+    is_thinking_mode = llm_ready and getattr(llm_config, 'aws_thinking_mode', None) == 'enabled'
 
-    if llm_config and llm_config.status == "Success":
+    if llm_ready:
         try:
             # Run LLM call with timeout to prevent hanging
-            # With thinking mode enabled, Claude can take 20+ minutes for complex analysis
-            # Check if thinking mode is enabled to adjust timeout
-            is_thinking_mode = getattr(llm_config, 'aws_thinking_mode', None) == 'enabled'
+            # With thinking mode enabled, Claude can take 20+ minutes for complex analysis,
+            # so the timeout depends on whether thinking mode is enabled
             timeout_seconds = 1800.0 if is_thinking_mode else 300.0  # 30 min for thinking, 5 min for non-thinking (should be much faster with 8000 max_tokens)
             
             try:
@@ -464,14 +468,16 @@ async def get_dimension_report(
                     rag_context = llm_response.get("rag_context")  # Capture RAG context
                 else:
                     llm_error = llm_response.get("error")
-                    logger.error(f"LLM analysis failed for dimension {dimension}: {llm_error}")
+                    logger.error("LLM analysis failed for dimension %s: %s", dimension, llm_error)
             except asyncio.TimeoutError:
                 timeout_minutes = int(timeout_seconds / 60)
                 llm_error = f"LLM analysis timed out after {timeout_minutes} minutes. {'With thinking mode enabled, this can take 20-30 minutes. ' if is_thinking_mode else ''}Please try again or check LLM configuration."
-                logger.error(f"LLM analysis timed out for dimension {dimension} after {timeout_minutes} minutes (thinking_mode={is_thinking_mode})")
+                logger.error("LLM analysis timed out for dimension %s after %s minutes (thinking_mode=%s)",
+                             dimension, timeout_minutes, is_thinking_mode)
         except Exception as e:
             llm_error = str(e)
-            logger.error(f"Exception generating dimension LLM analysis for {dimension}: {str(e)}\n{traceback.format_exc()}")
+            logger.error("Exception generating dimension LLM analysis for %s: %s\n%s",
+                         dimension, e, traceback.format_exc())
 
     # Generate facet-level LLM analyses
     category_llm_analyses = {}
@@ -480,84 +486,45 @@ async def get_dimension_report(
 
     # Facet-level analyses provide detailed insights by category, process, and lifecycle stage
     # These analyses enhance report quality by providing granular insights
-    if llm_config and llm_config.status == "Success":
-        is_thinking_mode = getattr(llm_config, 'aws_thinking_mode', None) == 'enabled'
+    if llm_ready:
         # Increase timeout for thinking mode, use reasonable timeout for standard mode
         facet_timeout = 600.0 if is_thinking_mode else 300.0  # 10 min for thinking, 5 min for standard
         
-        logger.info(f"Generating facet-level analyses for dimension {dimension} (timeout={facet_timeout}s, thinking_mode={is_thinking_mode})")
+        logger.info("Generating facet-level analyses for dimension %s (timeout=%ss, thinking_mode=%s)",
+                    dimension, facet_timeout, is_thinking_mode)
         
-        # Category analyses
-        for category_name, category_data in category_analysis.items():
+        # Facets of each type are analyzed concurrently in one batch
+        facet_batches = [
+            ('category', 'Category', category_analysis, category_llm_analyses),
+            ('process', 'Process', process_analysis, process_llm_analyses),
+            ('lifecycle_stage', 'Lifecycle', lifecycle_analysis, lifecycle_llm_analyses),
+        ]
+        for facet_type, label, facet_analysis, facet_llm_analyses in facet_batches:
             try:
-                llm_response = await asyncio.wait_for(
-                    LLMService.analyze_facet(
-                        llm_config,
-                        'category',
-                        category_name,
-                        category_data
-                    ),
+                facet_results = await LLMService.analyze_facets(
+                    llm_config,
+                    facet_type,
+                    facet_analysis,
                     timeout=facet_timeout
                 )
-                if llm_response.get("success"):
-                    category_llm_analyses[category_name] = llm_response.get("content")
-                    logger.info(f"✓ Category analysis completed for {category_name}")
-                else:
-                    logger.warning(f"Category analysis failed for {category_name}: {llm_response.get('error', 'Unknown error')}")
-            except asyncio.TimeoutError:
-                logger.warning(f"Category analysis timed out for {category_name} after {facet_timeout}s")
             except Exception as e:
-                logger.error(f"Category analysis error for {category_name}: {str(e)}")
+                logger.error("%s analysis error: %s", label, e)
+                continue
 
-        # Process analyses
-        for process_name, process_data in process_analysis.items():
-            try:
-                llm_response = await asyncio.wait_for(
-                    LLMService.analyze_facet(
-                        llm_config,
-                        'process',
-                        process_name,
-                        process_data
-                    ),
-                    timeout=facet_timeout
-                )
+            for facet_name, llm_response in facet_results.items():
                 if llm_response.get("success"):
-                    process_llm_analyses[process_name] = llm_response.get("content")
-                    logger.info(f"✓ Process analysis completed for {process_name}")
+                    facet_llm_analyses[facet_name] = llm_response.get("content")
+                    logger.info("✓ %s analysis completed for %s", label, facet_name)
                 else:
-                    logger.warning(f"Process analysis failed for {process_name}: {llm_response.get('error', 'Unknown error')}")
-            except asyncio.TimeoutError:
-                logger.warning(f"Process analysis timed out for {process_name} after {facet_timeout}s")
-            except Exception as e:
-                logger.error(f"Process analysis error for {process_name}: {str(e)}")
+                    logger.warning("%s analysis failed for %s: %s",
+                                   label, facet_name, llm_response.get('error', 'Unknown error'))
 
-        # Lifecycle analyses
-        for lifecycle_name, lifecycle_data in lifecycle_analysis.items():
-            try:
-                llm_response = await asyncio.wait_for(
-                    LLMService.analyze_facet(
-                        llm_config,
-                        'lifecycle_stage',
-                        lifecycle_name,
-                        lifecycle_data
-                    ),
-                    timeout=facet_timeout
-                )
-                if llm_response.get("success"):
-                    lifecycle_llm_analyses[lifecycle_name] = llm_response.get("content")
-                    logger.info(f"✓ Lifecycle analysis completed for {lifecycle_name}")
-                else:
-                    logger.warning(f"Lifecycle analysis failed for {lifecycle_name}: {llm_response.get('error', 'Unknown error')}")
-            except asyncio.TimeoutError:
-                logger.warning(f"Lifecycle analysis timed out for {lifecycle_name} after {facet_timeout}s")
-            except Exception as e:
-                logger.error(f"Lifecycle analysis error for {lifecycle_name}: {str(e)}")
-        
-        logger.info(f"Facet analysis summary: {len(category_llm_analyses)} categories, {len(process_llm_analyses)} processes, {len(lifecycle_llm_analyses)} lifecycle stages")
+        logger.info("Facet analysis summary: %s categories, %s processes, %s lifecycle stages",
+                    len(category_llm_analyses), len(process_llm_analyses), len(lifecycle_llm_analyses))
 
     # Generate comment sentiment analysis with LLM
     comment_llm_analysis = None
-    if llm_config and llm_config.status == "Success" and all_comments:
+    if llm_ready and all_comments:
         try:
             llm_response = await asyncio.wait_for(
                 LLMService.analyze_comments_sentiment(
@@ -597,12 +564,14 @@ async def get_dimension_report(
         # RAG context
         "rag_context": rag_context,
 
-        "llm_error": llm_error if llm_error else ("Orchestrate LLM not configured or test not successful" if not (llm_config and llm_config.status == "Success") else None)
+        "llm_error": llm_error if llm_error else ("Orchestrate LLM not configured or test not successful" if not llm_ready else None)
     }
 
     # Save reports to disk (markdown and JSON)
     try:
-        save_result = save_reports(
+        # Run blocking file I/O off the event loop
+        save_result = await asyncio.to_thread(
+            save_reports,
             customer_code=customer.customer_code,
             customer_name=customer.name,
             dimension=dimension,
@@ -610,11 +579,11 @@ async def get_dimension_report(
             rag_context=rag_context  # Pass RAG context retrieved from LLM analysis
         )
         if save_result.get('error'):
-            logger.warning(f"Report save had issues: {save_result['error']}")
+            logger.warning("Report save had issues: %s", save_result['error'])
         else:
-            logger.info(f"Reports saved: MD={save_result.get('markdown_path')}, JSON={save_result.get('json_path')}")
+            logger.info("Reports saved: MD=%s, JSON=%s", save_result.get('markdown_path'), save_result.get('json_path'))
     except Exception as e:
-        logger.error(f"Failed to save reports: {str(e)}")
+        logger.error("Failed to save reports: %s", e)
         # Don't fail the request if saving fails
 
     return report_response
@@ -650,9 +619,12 @@ async def get_overall_report(
 
     # Check for cached report if not forcing regeneration
     if not force_regenerate:
-        cached_report = get_cached_report(customer.customer_code, "Overall", survey.updated_at)
+        # Run blocking file I/O off the event loop
+        cached_report = await asyncio.to_thread(
+            get_cached_report, customer.customer_code, "Overall", survey.updated_at
+        )
         if cached_report:
-            logger.info(f"Returning cached overall report for {customer.customer_code}")
+            logger.info("Returning cached overall report for %s", customer.customer_code)
             return cached_report
 
     dimensions_query = db.query(models.Question.dimension).distinct().all()
@@ -783,16 +755,18 @@ async def get_overall_report(
                 models.LLMConfig.purpose == "Default"
             ).first()
         
-        logger.info(f"Orchestrate LLM check: found={orchestrate_llm is not None}, status={orchestrate_llm.status if orchestrate_llm else 'None'}, dimension_summaries_count={len(dimension_summaries)}")
+        logger.info("Orchestrate LLM check: found=%s, status=%s, dimension_summaries_count=%s",
+                    orchestrate_llm is not None, orchestrate_llm.status if orchestrate_llm else 'None',
+                    len(dimension_summaries))
         
         if orchestrate_llm and orchestrate_llm.status == "Success":
             # Check if we have valid dimension summaries (not all error messages)
             valid_summaries = {k: v for k, v in dimension_summaries.items() 
-                             if v and not v.startswith("LLM not configured") and not v.startswith("Error:")}
+                             if v and not v.startswith(("LLM not configured", "Error:"))}
             
             if not valid_summaries:
                 overall_error = "No valid dimension summaries available. Please ensure at least one dimension has a tested LLM configuration."
-                logger.warning(f"All dimension summaries are errors: {list(dimension_summaries.values())}")
+                logger.warning("All dimension summaries are errors: %s", list(dimension_summaries.values()))
             else:
                 # Use only valid summaries for overall report
                 llm_response = await LLMService.generate_overall_summary(
@@ -805,13 +779,14 @@ async def get_overall_report(
                     overall_summary = llm_response.get("markdown_content") or llm_response.get("content")
                 else:
                     overall_error = llm_response.get("error")
-                    logger.error(f"LLM overall summary generation failed: {overall_error}")
+                    logger.error("LLM overall summary generation failed: %s", overall_error)
         else:
             overall_error = "Orchestrate LLM not configured or test not successful"
-            logger.warning(f"Orchestrate LLM not available: status={orchestrate_llm.status if orchestrate_llm else 'None'}")
+            logger.warning("Orchestrate LLM not available: status=%s",
+                           orchestrate_llm.status if orchestrate_llm else 'None')
     except Exception as e:
         overall_error = str(e)
-        logger.error(f"Exception generating overall summary: {str(e)}\n{traceback.format_exc()}")
+        logger.error("Exception generating overall summary: %s\n%s", e, traceback.format_exc())
     
     # Aggregate dimension-level data for cross-dimension analysis
     all_dimension_data = []
@@ -866,7 +841,9 @@ async def get_overall_report(
 
     # Save reports to disk (markdown and JSON)
     try:
-        save_result = save_reports(
+        # Run blocking file I/O off the event loop
+        save_result = await asyncio.to_thread(
+            save_reports,
             customer_code=customer.customer_code,
             customer_name=customer.name,
             dimension="Overall",
@@ -874,11 +851,12 @@ async def get_overall_report(
             rag_context=None  # RAG context is dimension-specific, not applicable for overall report
         )
         if save_result.get('error'):
-            logger.warning(f"Report save had issues: {save_result['error']}")
+            logger.warning("Report save had issues: %s", save_result['error'])
         else:
-            logger.info(f"Overall reports saved: MD={save_result.get('markdown_path')}, JSON={save_result.get('json_path')}")
+            logger.info("Overall reports saved: MD=%s, JSON=%s",
+                        save_result.get('markdown_path'), save_result.get('json_path'))
     except Exception as e:
-        logger.error(f"Failed to save overall reports: {str(e)}")
+        logger.error("Failed to save overall reports: %s", e)
         # Don't fail the request if saving fails
 
     return report_response
\ No newline at end of file
@@ -1,12 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Dict
 from .. import models, schemas, auth
 from ..database import get_db
+from .utils import json_response
+import json
 
 router = APIRouter()
 
+def get_total_questions(db: Session, user_type: models.UserType) -> int:
+    """Get the number of questions a user of the given type must answer."""
+    query = db.query(func.count(models.Question.id))
+    # CXO users only need to answer CXO questions
+    if user_type == models.UserType.CXO:
+        query = query.filter(models.Question.question_type == 'CXO')
+    return query.scalar()
+
+def get_customer_survey(db: Session, current_user: models.User, create: bool = False):
+    """Get the survey for the current user's customer, optionally creating it."""
+    survey = db.query(models.Survey).filter(
+        models.Survey.customer_id == current_user.customer_id
+    ).first()
+
+    if not survey and create:
+        survey = models.Survey(customer_id=current_user.customer_id)
+        db.add(survey)
+        db.commit()
+        db.refresh(survey)
+
+    return survey
+
 @router.get("/questions", response_model=List[schemas.Question])
 def get_questions(
     db: Session = Depends(get_db),
@@ -20,7 +44,7 @@ def get_questions(
         query = query.filter(models.Question.question_type == 'CXO')
 
     questions = query.all()
-    return questions
+    return json_response(schemas.QUESTION_LIST_ADAPTER, questions)
 
 @router.get("/dimensions")
 def get_dimensions(
@@ -47,15 +71,7 @@ def get_survey_progress(
         )
     
     # Get or create survey for this customer
-    survey = db.query(models.Survey).filter(
-        models.Survey.customer_id == current_user.customer_id
-    ).first()
-    
-    if not survey:
-        survey = models.Survey(customer_id=current_user.customer_id)
-        db.add(survey)
-        db.commit()
-        db.refresh(survey)
+    survey = get_customer_survey(db, current_user, create=True)
     
     # Get all dimensions
     dimensions = db.query(models.Question.dimension).distinct().all()
@@ -85,7 +101,7 @@ def get_survey_progress(
         if current_user.user_type == models.UserType.CXO:
             answer_query = answer_query.filter(models.Question.question_type == 'CXO')
 
-        answered_questions = answer_query.distinct(models.SurveyResponse.question_id).count()
+        answered_questions = answer_query.count()
         
         # Determine status
         if answered_questions == 0:
@@ -102,7 +118,8 @@ def get_survey_progress(
             "status": status
         })
     
-    return progress
+    # Serialize once through the prebuilt adapter
+    return json_response(schemas.DIMENSION_PROGRESS_LIST_ADAPTER, progress)
 
 @router.get("/questions/{dimension}", response_model=List[schemas.Question])
 def get_questions_by_dimension(
@@ -120,7 +137,7 @@ def get_questions_by_dimension(
         query = query.filter(models.Question.question_type == 'CXO')
 
     questions = query.all()
-    return questions
+    return json_response(schemas.QUESTION_LIST_ADAPTER, questions)
 
 @router.get("/responses/{dimension}")
 def get_user_responses_for_dimension(
@@ -133,9 +150,7 @@ def get_user_responses_for_dimension(
     Returns dict mapping question_id to {score, comment}. (Customer users only)
     """
     # Get survey for this customer
-    survey = db.query(models.Survey).filter(
-        models.Survey.customer_id == current_user.customer_id
-    ).first()
+    survey = get_customer_survey(db, current_user)
     
     if not survey:
         return {}
@@ -159,11 +174,15 @@ def get_user_responses_for_dimension(
         models.SurveyResponse.question_id.in_(question_ids)
     ).all()
     
-    # Format as dict
-    return {
-        r.question_id: {"score": r.score, "comment": r.comment} 
-        for r in responses
-    }
+    # Format as dict; plain str/None values, so encode directly rather than
+    # through FastAPI's recursive jsonable_encoder
+    return Response(
+        content=json.dumps({
+            r.question_id: {"score": r.score, "comment": r.comment}
+            for r in responses
+        }),
+        media_type="application/json"
+    )
 
 @router.post("/responses")
 def save_response(
@@ -182,15 +201,7 @@ def save_response(
         )
     
     # Get or create survey
-    survey = db.query(models.Survey).filter(
-        models.Survey.customer_id == current_user.customer_id
-    ).first()
-    
-    if not survey:
-        survey = models.Survey(customer_id=current_user.customer_id)
-        db.add(survey)
-        db.commit()
-        db.refresh(survey)
+    survey = get_customer_survey(db, current_user, create=True)
     
     # Check if current user has already submitted
     user_submission = db.query(models.UserSurveySubmission).filter(
@@ -260,9 +271,7 @@ def submit_survey(
         )
     
     # Get survey
-    survey = db.query(models.Survey).filter(
-        models.Survey.customer_id == current_user.customer_id
-    ).first()
+    survey = get_customer_survey(db, current_user)
     
     if not survey:
         raise HTTPException(status_code=400, detail="No survey found")
@@ -280,12 +289,7 @@ def submit_survey(
         )
     
     # Validate all relevant questions are answered (filtered by user type)
-    question_query = db.query(models.Question)
-    # CXO users only need to answer CXO questions
-    if current_user.user_type == models.UserType.CXO:
-        question_query = question_query.filter(models.Question.question_type == 'CXO')
-
-    total_questions = question_query.count()
+    total_questions = get_total_questions(db, current_user.user_type)
 
     # Count answered questions (filtered by user type)
     answer_query = db.query(models.SurveyResponse).join(models.Question).filter(
@@ -297,7 +301,7 @@ def submit_survey(
     if current_user.user_type == models.UserType.CXO:
         answer_query = answer_query.filter(models.Question.question_type == 'CXO')
 
-    answered = answer_query.distinct(models.SurveyResponse.question_id).count()
+    answered = answer_query.count()
 
     if answered < total_questions:
         raise HTTPException(
@@ -348,15 +352,11 @@ def get_survey_status(
     if not current_user.customer_id:
         return {"status": "Not Started", "customer_code": None}
     
-    # Get customer
-    customer = db.query(models.Customer).filter(
-        models.Customer.id == current_user.customer_id
-    ).first()
+    # Get customer (relationship is cached in the session's identity map)
+    customer = current_user.customer
     
     # Get survey
-    survey = db.query(models.Survey).filter(
-        models.Survey.customer_id == current_user.customer_id
-    ).first()
+    survey = get_customer_survey(db, current_user)
     
     if not survey:
         return {
@@ -377,12 +377,7 @@ def get_survey_status(
         }
     
     # Calculate progress for the CURRENT USER (filtered by user type)
-    question_query = db.query(models.Question)
-    # CXO users only see CXO questions
-    if current_user.user_type == models.UserType.CXO:
-        question_query = question_query.filter(models.Question.question_type == 'CXO')
-
-    total_questions = question_query.count()
+    total_questions = get_total_questions(db, current_user.user_type)
 
     # Count answered questions (filtered by user type)
     answer_query = db.query(models.SurveyResponse).join(models.Question).filter(
@@ -394,7 +389,7 @@ def get_survey_status(
     if current_user.user_type == models.UserType.CXO:
         answer_query = answer_query.filter(models.Question.question_type == 'CXO')
 
-    answered = answer_query.distinct(models.SurveyResponse.question_id).count()
+    answered = answer_query.count()
     
     if answered == 0:
         status = "Not Started"
@@ -3,10 +3,11 @@ from sqlalchemy.orm import Session
 from typing import List
 from .. import models, schemas, auth
 from ..database import get_db
+from .utils import json_response
 
 router = APIRouter()
 
-@router.post("/", response_model=schemas.User)
+@router.post("/", response_model=schemas.UserWithPassword)
 def create_user(
     user: schemas.UserCreate,
     db: Session = Depends(get_db),
@@ -34,9 +35,9 @@ def create_user(
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    return db_user
+    return json_response(schemas.UserWithPassword, db_user)
 
-@router.get("/", response_model=List[schemas.UserWithCustomer])
+@router.get("/", response_model=List[schemas.UserWithCustomerAndPassword])
 def list_users(
     skip: int = 0,
     limit: int = 100,
@@ -46,9 +47,9 @@ def list_users(
     users = db.query(models.User).filter(
         models.User.is_deleted == False
     ).offset(skip).limit(limit).all()
-    return users
+    return json_response(schemas.USER_WITH_CUSTOMER_AND_PASSWORD_LIST_ADAPTER, users)
 
-@router.get("/{user_id}", response_model=schemas.UserWithCustomer)
+@router.get("/{user_id}", response_model=schemas.UserWithCustomerAndPassword)
 def get_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -60,9 +61,9 @@ def get_user(
     ).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return json_response(schemas.UserWithCustomerAndPassword, user)
 
-@router.put("/{user_id}", response_model=schemas.User)
+@router.put("/{user_id}", response_model=schemas.UserWithPassword)
 def update_user(
     user_id: int,
     user_update: schemas.UserUpdate,
@@ -93,7 +94,7 @@ def update_user(
     
     db.commit()
     db.refresh(db_user)
-    return db_user
+    return json_response(schemas.UserWithPassword, db_user)
 
 @router.delete("/{user_id}")
 def delete_user(
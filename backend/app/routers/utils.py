@@ -0,0 +1,11 @@
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def json_response(schema: type[BaseModel] | TypeAdapter, obj) -> Response:
+    """Validate ORM data through a response model or adapter and return it as a JSON response"""
+    if isinstance(schema, TypeAdapter):
+        content = schema.dump_json(schema.validate_python(obj, from_attributes=True))
+    else:
+        content = schema.model_validate(obj, from_attributes=True).model_dump_json()
+    return Response(content=content, media_type="application/json")
@@ -1,14 +1,15 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+from typing import List, Literal
+from typing_extensions import TypedDict
 from datetime import datetime
 from .models import UserType, LLMProviderType
 
 class CustomerBase(BaseModel):
     name: str
     customer_code: str
-    industry: Optional[str] = None
-    location: Optional[str] = None
-    description: Optional[str] = None
+    industry: str | None = None
+    location: str | None = None
+    description: str | None = None
 
 class CustomerCreate(CustomerBase):
     pass
@@ -21,61 +22,66 @@ class Customer(CustomerBase):
     is_deleted: bool
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class UserBase(BaseModel):
     user_id: str
     username: str
     user_type: UserType
-    customer_id: Optional[int] = None
+    customer_id: int | None = None
 
 class UserCreate(UserBase):
     password: str
 
 class UserUpdate(BaseModel):
-    username: Optional[str] = None
-    user_type: Optional[UserType] = None
-    customer_id: Optional[int] = None
-    password: Optional[str] = None
+    username: str | None = None
+    user_type: UserType | None = None
+    customer_id: int | None = None
+    password: str | None = None
 
 class User(UserBase):
     id: int
     is_deleted: bool
     created_at: datetime
-    password: Optional[str] = None  # For returning decrypted password to admin
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class UserWithCustomer(User):
-    customer: Optional[Customer] = None
+    customer: Customer | None = None
 
-class Token(BaseModel):
+class UserWithPassword(User):
+    password: str | None = None  # For returning decrypted password to admin
+
+class UserWithCustomerAndPassword(UserWithCustomer):
+    password: str | None = None  # For returning decrypted password to admin
+
+class Token(TypedDict):
     access_token: str
-    token_type: str
+    token_type: Literal["bearer"]
     user: User
 
 class LLMConfigBase(BaseModel):
     purpose: str
     provider_type: LLMProviderType = LLMProviderType.LOCAL
-    model_name: Optional[str] = "default"
+    model_name: str | None = "default"
 
     # Local LLM fields
-    api_url: Optional[str] = None
-    api_key: Optional[str] = None
+    api_url: str | None = None
+    api_key: str | None = None
 
     # AWS Bedrock fields
-    aws_region: Optional[str] = None
-    aws_access_key_id: Optional[str] = None
-    aws_secret_access_key: Optional[str] = None
-    aws_model_id: Optional[str] = None
-    aws_thinking_mode: Optional[str] = None  # For Claude Sonnet: enabled, disabled
+    aws_region: str | None = None
+    aws_access_key_id: str | None = None
+    aws_secret_access_key: str | None = None
+    aws_model_id: str | None = None
+    aws_thinking_mode: str | None = None  # For Claude Sonnet: enabled, disabled
 
     # Azure OpenAI fields
-    azure_endpoint: Optional[str] = None
-    azure_api_key: Optional[str] = None
-    azure_deployment_name: Optional[str] = None
-    azure_api_version: Optional[str] = "2024-02-15-preview"
-    azure_reasoning_effort: Optional[str] = None  # For GPT-5: minimal, low, medium, high
+    azure_endpoint: str | None = None
+    azure_api_key: str | None = None
+    azure_deployment_name: str | None = None
+    azure_api_version: str | None = "2024-02-15-preview"
+    azure_reasoning_effort: str | None = None  # For GPT-5: minimal, low, medium, high
 
 class LLMConfigCreate(LLMConfigBase):
     pass
@@ -85,57 +91,71 @@ class LLMConfigUpdate(LLMConfigBase):
 
 class LLMConfig(LLMConfigBase):
     id: int
-    status: str
+    status: Literal["Not Tested", "Success", "Failed"]
     created_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class QuestionBase(BaseModel):
     question_id: int
     text: str
-    category: Optional[str]
+    category: str | None
     dimension: str
-    question_type: Optional[str]
-    guidance: Optional[str]
-    process: Optional[str]
-    lifecycle_stage: Optional[str]
+    question_type: str | None
+    guidance: str | None
+    process: str | None
+    lifecycle_stage: str | None
 
 class Question(QuestionBase):
     id: int
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class SurveyResponseCreate(BaseModel):
     question_id: int
-    score: Optional[str] = None
-    comment: Optional[str] = None
+    score: str | None = None
+    comment: str | None = None
 
 class SurveyResponseUpdate(BaseModel):
-    score: Optional[str] = None
-    comment: Optional[str] = None
+    score: str | None = None
+    comment: str | None = None
 
 class SurveyResponse(BaseModel):
     id: int
     survey_id: int
     user_id: int
     question_id: int
-    score: Optional[str]
-    comment: Optional[str]
+    score: str | None
+    comment: str | None
     updated_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class Survey(BaseModel):
     id: int
     customer_id: int
-    status: str
-    submitted_at: Optional[datetime]
+    status: Literal["Not Started", "In Progress", "Submitted"]
+    submitted_at: datetime | None
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class DimensionProgress(BaseModel):
     dimension: str
     total_questions: int
     answered_questions: int
-    status: str
\ No newline at end of file
+    status: str
+
+# Token is a plain envelope, so it is a TypedDict validated through an adapter
+# rather than a model; only the nested User goes through model construction.
+# Being a dict, it has no attribute access, model_dump() or validation on
+# construction; build it as a literal and serialize it via TOKEN_ADAPTER.
+TOKEN_ADAPTER = TypeAdapter(Token)
+
+# Reusable adapters for list endpoints. Validating and serializing the whole
+# list in one call avoids per-row model dispatch and rebuilding validators.
+CUSTOMER_LIST_ADAPTER = TypeAdapter(List[Customer])
+USER_WITH_CUSTOMER_AND_PASSWORD_LIST_ADAPTER = TypeAdapter(List[UserWithCustomerAndPassword])
+QUESTION_LIST_ADAPTER = TypeAdapter(List[Question])
+LLM_CONFIG_LIST_ADAPTER = TypeAdapter(List[LLMConfig])
+DIMENSION_PROGRESS_LIST_ADAPTER = TypeAdapter(List[DimensionProgress])
@@ -16,12 +16,13 @@ Available Migrations:
     - llm_providers      : Add multi-provider LLM support (LOCAL, BEDROCK, AZURE)
     - questions_fields   : Add process and lifecycle_stage columns to questions table
     - user_submissions   : Create user_survey_submissions table
+    - response_unique    : Add unique constraint on survey_responses (removes duplicates)
 """
 
 import sys
 import json
 import argparse
-from sqlalchemy import text, inspect
+from sqlalchemy import text, inspect, func
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app import models, auth
@@ -32,7 +33,9 @@ class DatabaseSetup:
 
     def __init__(self):
         self.db = SessionLocal()
-        self.inspector = inspect(engine)
+        # Reflected table names and per-table column names, loaded on first use
+        self._tables = None
+        self._columns = {}
 
     def __enter__(self):
         return self
@@ -45,15 +48,32 @@ class DatabaseSetup:
 
     def table_exists(self, table_name: str) -> bool:
         """Check if a table exists"""
-        return table_name in self.inspector.get_table_names()
+        if self._tables is None:
+            self._tables = set(self._inspector().get_table_names())
+        return table_name in self._tables
 
     def column_exists(self, table_name: str, column_name: str) -> bool:
         """Check if a column exists in a table"""
         if not self.table_exists(table_name):
             return False
-        columns = [col['name'] for col in self.inspector.get_columns(table_name)]
+        columns = self._columns.get(table_name)
+        if columns is None:
+            columns = {col['name'] for col in self._inspector().get_columns(table_name)}
+            self._columns[table_name] = columns
         return column_name in columns
 
+    def _inspector(self):
+        """
+        Inspector on the session's own connection, so reflection sees DDL run
+        earlier in the same (still uncommitted) migration transaction
+        """
+        return inspect(self.db.connection())
+
+    def _clear_schema_cache(self):
+        """Forget reflected tables and columns after the schema has changed"""
+        self._tables = None
+        self._columns.clear()
+
     # ==================== Initialization ====================
 
     def initialize_database(self):
@@ -65,6 +85,7 @@ class DatabaseSetup:
         # Step 1: Create all tables
         print("\n[1/3] Creating database tables...")
         models.Base.metadata.create_all(bind=engine)
+        self._clear_schema_cache()
         print("✅ Tables created successfully!")
 
         # Step 2: Create default admin user
@@ -95,35 +116,37 @@ class DatabaseSetup:
         question_count = self.db.query(models.Question).count()
         if question_count == 0:
             try:
-                with open('questions.json', 'r', encoding='utf-8') as f:
-                    questions_data = json.load(f)
+                with open('questions.json', 'rb') as f:
+                    questions_data = json.loads(f.read())
 
                 print(f"Found {len(questions_data)} questions in file.")
 
-                for q in questions_data:
-                    question = models.Question(
-                        question_id=q['id'],
-                        text=q['text'],
-                        category=q.get('category'),
-                        dimension=q['dimension'],
-                        question_type=q.get('question_type'),
-                        guidance=q.get('guidance'),
-                        process=q.get('process'),
-                        lifecycle_stage=q.get('lifecycle_stage')
-                    )
-                    self.db.add(question)
+                # Insert all rows as plain mappings in batched multi-row INSERTs,
+                # without building an ORM object per question
+                self.db.bulk_insert_mappings(models.Question, [
+                    {
+                        'question_id': q['id'],
+                        'text': q['text'],
+                        'category': q.get('category'),
+                        'dimension': q['dimension'],
+                        'question_type': q.get('question_type'),
+                        'guidance': q.get('guidance'),
+                        'process': q.get('process'),
+                        'lifecycle_stage': q.get('lifecycle_stage')
+                    }
+                    for q in questions_data
+                ])
 
                 self.db.commit()
                 print(f"✅ Loaded {len(questions_data)} questions!")
 
                 # Show dimension summary
-                dimensions = self.db.query(models.Question.dimension).distinct().all()
-                print(f"\n📊 Questions across {len(dimensions)} dimensions:")
-                for dim in dimensions:
-                    count = self.db.query(models.Question).filter(
-                        models.Question.dimension == dim[0]
-                    ).count()
-                    print(f"   • {dim[0]}: {count} questions")
+                dimension_counts = self.db.query(
+                    models.Question.dimension, func.count(models.Question.id)
+                ).group_by(models.Question.dimension).all()
+                print(f"\n📊 Questions across {len(dimension_counts)} dimensions:")
+                for dimension, count in dimension_counts:
+                    print(f"   • {dimension}: {count} questions")
 
             except FileNotFoundError:
                 print("❌ ERROR: questions.json file not found!")
@@ -138,7 +161,7 @@ class DatabaseSetup:
 
     # ==================== Migrations ====================
 
-    def migrate_password_column(self):
+    def migrate_password_column(self, commit: bool = True):
         """Add password column to users table for plain-text password storage"""
         print("\n[Migration: password] Adding password column to users table...")
 
@@ -160,13 +183,14 @@ class DatabaseSetup:
             """), {"admin_pwd": auth.encrypt_password("admin123"),
                    "default_pwd": auth.encrypt_password("Welcome123!")})
 
-            self.db.commit()
+            if commit:
+                self.db.commit()
             print("✅ Password column added successfully!")
         except Exception as e:
             print(f"❌ Migration failed: {e}")
             raise
 
-    def migrate_llm_model_name(self):
+    def migrate_llm_model_name(self, commit: bool = True):
         """Add model_name column to llm_configs table"""
         print("\n[Migration: llm_model] Adding model_name to llm_configs...")
 
@@ -178,13 +202,14 @@ class DatabaseSetup:
             self.db.execute(text(
                 "ALTER TABLE llm_configs ADD COLUMN model_name VARCHAR(100) DEFAULT 'default'"
             ))
-            self.db.commit()
+            if commit:
+                self.db.commit()
             print("✅ model_name column added successfully!")
         except Exception as e:
             print(f"❌ Migration failed: {e}")
             raise
 
-    def migrate_llm_providers(self):
+    def migrate_llm_providers(self, commit: bool = True):
         """Add multi-provider LLM support (LOCAL, BEDROCK, AZURE)"""
         print("\n[Migration: llm_providers] Adding multi-provider support...")
 
@@ -202,33 +227,33 @@ class DatabaseSetup:
                 END $$;
             """))
 
-            # Add provider_type column
-            self.db.execute(text(
-                "ALTER TABLE llm_configs ADD COLUMN provider_type llmprovidertype DEFAULT 'LOCAL'"
-            ))
-
-            # Add AWS Bedrock fields
-            self.db.execute(text("ALTER TABLE llm_configs ADD COLUMN aws_region VARCHAR(50)"))
-            self.db.execute(text("ALTER TABLE llm_configs ADD COLUMN aws_access_key_id TEXT"))
-            self.db.execute(text("ALTER TABLE llm_configs ADD COLUMN aws_secret_access_key TEXT"))
-            self.db.execute(text("ALTER TABLE llm_configs ADD COLUMN aws_model_id VARCHAR(100)"))
-
-            # Add Azure OpenAI fields
-            self.db.execute(text("ALTER TABLE llm_configs ADD COLUMN azure_endpoint TEXT"))
-            self.db.execute(text("ALTER TABLE llm_configs ADD COLUMN azure_api_key TEXT"))
-            self.db.execute(text("ALTER TABLE llm_configs ADD COLUMN azure_deployment_name VARCHAR(100)"))
-            self.db.execute(text("ALTER TABLE llm_configs ADD COLUMN azure_api_version VARCHAR(20)"))
-
-            # Make api_url nullable (only required for LOCAL provider)
-            self.db.execute(text("ALTER TABLE llm_configs ALTER COLUMN api_url DROP NOT NULL"))
+            # Add the provider columns and relax api_url in a single ALTER TABLE
+            # (one lock acquisition and one round trip instead of ten)
+            self.db.execute(text("""
+                ALTER TABLE llm_configs
+                    ADD COLUMN provider_type llmprovidertype DEFAULT 'LOCAL',
+                    -- AWS Bedrock fields
+                    ADD COLUMN aws_region VARCHAR(50),
+                    ADD COLUMN aws_access_key_id TEXT,
+                    ADD COLUMN aws_secret_access_key TEXT,
+                    ADD COLUMN aws_model_id VARCHAR(100),
+                    -- Azure OpenAI fields
+                    ADD COLUMN azure_endpoint TEXT,
+                    ADD COLUMN azure_api_key TEXT,
+                    ADD COLUMN azure_deployment_name VARCHAR(100),
+                    ADD COLUMN azure_api_version VARCHAR(20),
+                    -- api_url is only required for the LOCAL provider
+                    ALTER COLUMN api_url DROP NOT NULL
+            """))
 
-            self.db.commit()
+            if commit:
+                self.db.commit()
             print("✅ Multi-provider support added successfully!")
         except Exception as e:
             print(f"❌ Migration failed: {e}")
             raise
 
-    def migrate_questions_fields(self):
+    def migrate_questions_fields(self, commit: bool = True):
         """Add process and lifecycle_stage columns to questions table"""
         print("\n[Migration: questions_fields] Adding process and lifecycle_stage...")
 
@@ -237,15 +262,19 @@ class DatabaseSetup:
             return
 
         try:
-            self.db.execute(text("ALTER TABLE questions ADD COLUMN process VARCHAR(100)"))
-            self.db.execute(text("ALTER TABLE questions ADD COLUMN lifecycle_stage VARCHAR(100)"))
-            self.db.commit()
+            self.db.execute(text("""
+                ALTER TABLE questions
+                    ADD COLUMN process VARCHAR(100),
+                    ADD COLUMN lifecycle_stage VARCHAR(100)
+            """))
+            if commit:
+                self.db.commit()
             print("✅ Questions fields added successfully!")
         except Exception as e:
             print(f"❌ Migration failed: {e}")
             raise
 
-    def migrate_user_submissions(self):
+    def migrate_user_submissions(self, commit: bool = True):
         """Create user_survey_submissions table"""
         print("\n[Migration: user_submissions] Creating user_survey_submissions table...")
 
@@ -273,12 +302,51 @@ class DatabaseSetup:
                 "CREATE INDEX idx_user_submissions_user ON user_survey_submissions(user_id)"
             ))
 
-            self.db.commit()
+            if commit:
+                self.db.commit()
             print("✅ user_survey_submissions table created successfully!")
         except Exception as e:
             print(f"❌ Migration failed: {e}")
             raise
 
+    def migrate_response_unique(self, commit: bool = True):
+        """Add unique constraint on survey_responses(survey_id, user_id, question_id)"""
+        print("\n[Migration: response_unique] Adding unique constraint to survey_responses...")
+
+        if not self.table_exists('survey_responses'):
+            print("⚠️  Table 'survey_responses' does not exist yet.")
+            return
+
+        constraints = self._inspector().get_unique_constraints('survey_responses')
+        if any(c['name'] == 'uq_survey_user_question' for c in constraints):
+            print("⚠️  Constraint 'uq_survey_user_question' already exists.")
+            return
+
+        try:
+            # Keep the first response per user and question; that is the row
+            # the survey endpoints read and update
+            result = self.db.execute(text("""
+                DELETE FROM survey_responses
+                WHERE id NOT IN (
+                    SELECT MIN(id) FROM survey_responses
+                    GROUP BY survey_id, user_id, question_id
+                )
+            """))
+            if result.rowcount:
+                print(f"   Removed {result.rowcount} duplicate responses")
+
+            self.db.execute(text("""
+                ALTER TABLE survey_responses
+                ADD CONSTRAINT uq_survey_user_question UNIQUE (survey_id, user_id, question_id)
+            """))
+
+            if commit:
+                self.db.commit()
+            print("✅ Unique constraint added successfully!")
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            raise
+
     def run_all_migrations(self):
         """Run all migrations in order"""
         print("\n" + "="*60)
@@ -291,16 +359,26 @@ class DatabaseSetup:
             ("llm_providers", self.migrate_llm_providers),
             ("questions_fields", self.migrate_questions_fields),
             ("user_submissions", self.migrate_user_submissions),
+            ("response_unique", self.migrate_response_unique),
         ]
 
+        # All migrations share one transaction and a single commit, so a
+        # failing step rolls the whole run back instead of leaving the
+        # schema half-migrated
         for name, migration_func in migrations:
             try:
-                migration_func()
+                migration_func(commit=False)
+                self._clear_schema_cache()
             except Exception as e:
+                self.db.rollback()
+                self._clear_schema_cache()
                 print(f"❌ Migration '{name}' failed: {e}")
-                print("Stopping migration process.")
+                print("Stopping migration process. No migrations were applied.")
                 return False
 
+        self.db.commit()
+        self._clear_schema_cache()
+
         print("\n✅ All migrations completed successfully!")
         return True
 
@@ -309,11 +387,18 @@ class DatabaseSetup:
         print("\n" + "="*60)
         print(f"  {operation_type} COMPLETE!")
         print("="*60)
+        # All four counts in a single round trip
+        question_count, customer_count, user_count, survey_count = self.db.execute(text("""
+            SELECT (SELECT COUNT(*) FROM questions),
+                   (SELECT COUNT(*) FROM customers),
+                   (SELECT COUNT(*) FROM users),
+                   (SELECT COUNT(*) FROM surveys)
+        """)).one()
         print("\n📝 Database Summary:")
-        print(f"   • Questions: {self.db.query(models.Question).count()}")
-        print(f"   • Customers: {self.db.query(models.Customer).count()}")
-        print(f"   • Users: {self.db.query(models.User).count()}")
-        print(f"   • Surveys: {self.db.query(models.Survey).count()}")
+        print(f"   • Questions: {question_count}")
+        print(f"   • Customers: {customer_count}")
+        print(f"   • Users: {user_count}")
+        print(f"   • Surveys: {survey_count}")
 
         print("\n🚀 Application URLs:")
         print("   Frontend: http://localhost:3000")
@@ -341,7 +426,8 @@ def main():
     parser.add_argument('--migrate', action='store_true',
                         help='Run all migrations')
     parser.add_argument('--migrate-specific', type=str,
-                        choices=['password', 'llm_model', 'llm_providers', 'questions_fields', 'user_submissions'],
+                        choices=['password', 'llm_model', 'llm_providers', 'questions_fields', 'user_submissions',
+                                 'response_unique'],
                         help='Run a specific migration')
 
     args = parser.parse_args()
@@ -367,6 +453,7 @@ def main():
                     'llm_providers': db_setup.migrate_llm_providers,
                     'questions_fields': db_setup.migrate_questions_fields,
                     'user_submissions': db_setup.migrate_user_submissions,
+                    'response_unique': db_setup.migrate_response_unique,
                 }
                 migration_map[args.migrate_specific]()
                 db_setup._print_summary(f"MIGRATION ({args.migrate_specific.upper()})")
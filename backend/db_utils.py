@@ -17,6 +17,7 @@ import sys
 import json
 import argparse
 from collections import defaultdict
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app import models, auth
@@ -46,32 +47,39 @@ class DatabaseUtils:
         print("="*60)
 
         try:
-            with open('questions.json', 'r', encoding='utf-8') as f:
-                questions_data = json.load(f)
+            with open('questions.json', 'rb') as f:
+                questions_data = json.loads(f.read())
 
-            print(f"\nFound {len(questions_data)} questions in file.")
+            total = len(questions_data)
+            print(f"\nFound {total} questions in file.")
             updated_count = 0
             batch_size = 100
 
-            for i, q_data in enumerate(questions_data):
-                question = self.db.query(models.Question).filter(
-                    models.Question.question_id == q_data['id']
-                ).first()
-
-                if question:
-                    question.category = q_data.get('category')
-                    question.question_type = q_data.get('question_type')
-                    question.process = q_data.get('process')
-                    question.lifecycle_stage = q_data.get('lifecycle_stage')
-                    updated_count += 1
-
-                    # Commit in batches
-                    if (i + 1) % batch_size == 0:
-                        self.db.commit()
-                        print(f"  Processed {i + 1}/{len(questions_data)} questions...")
-
-            # Final commit
-            self.db.commit()
+            # Map question_id -> primary key in one query, so each batch is a
+            # single bulk UPDATE keyed on the primary key instead of a SELECT per row
+            question_pks = dict(
+                self.db.query(models.Question.question_id, models.Question.id).all()
+            )
+
+            for start in range(0, total, batch_size):
+                mappings = [
+                    {
+                        'id': question_pks[q_data['id']],
+                        'category': q_data.get('category'),
+                        'question_type': q_data.get('question_type'),
+                        'process': q_data.get('process'),
+                        'lifecycle_stage': q_data.get('lifecycle_stage')
+                    }
+                    for q_data in questions_data[start:start + batch_size]
+                    if q_data['id'] in question_pks
+                ]
+
+                # Commit in batches
+                if mappings:
+                    self.db.bulk_update_mappings(models.Question, mappings)
+                    self.db.commit()
+                    updated_count += len(mappings)
+                print(f"  Processed {min(start + batch_size, total)}/{total} questions...")
             print(f"\n✅ Updated {updated_count} questions successfully!")
 
         except FileNotFoundError:
@@ -88,14 +96,14 @@ class DatabaseUtils:
         print("  QUESTION DATA VALIDATION REPORT")
         print("="*60)
 
-        questions = self.db.query(models.Question).all()
-        total = len(questions)
-
-        # Count field population
-        category_count = sum(1 for q in questions if q.category)
-        question_type_count = sum(1 for q in questions if q.question_type)
-        process_count = sum(1 for q in questions if q.process)
-        lifecycle_count = sum(1 for q in questions if q.lifecycle_stage)
+        # Count field population in one aggregate query
+        total, category_count, question_type_count, process_count, lifecycle_count = self.db.query(
+            func.count(models.Question.id),
+            func.count(func.nullif(models.Question.category, '')),
+            func.count(func.nullif(models.Question.question_type, '')),
+            func.count(func.nullif(models.Question.process, '')),
+            func.count(func.nullif(models.Question.lifecycle_stage, ''))
+        ).one()
 
         print(f"\n📊 Overall Statistics:")
         print(f"   Total Questions: {total}")
@@ -106,14 +114,7 @@ class DatabaseUtils:
 
         # Group by dimension
         print(f"\n📋 Questions by Dimension:")
-        dimension_data = defaultdict(lambda: {'total': 0, 'cxo': 0, 'general': 0})
-
-        for q in questions:
-            dimension_data[q.dimension]['total'] += 1
-            if q.question_type == 'CXO':
-                dimension_data[q.dimension]['cxo'] += 1
-            elif q.question_type == 'General':
-                dimension_data[q.dimension]['general'] += 1
+        dimension_data = self._dimension_type_counts()
 
         for dim, data in sorted(dimension_data.items()):
             print(f"\n   {dim}:")
@@ -123,7 +124,7 @@ class DatabaseUtils:
 
         # Show sample questions with new fields
         print(f"\n📝 Sample Questions (first 3):")
-        for q in questions[:3]:
+        for q in self.db.query(models.Question).order_by(models.Question.id).limit(3):
             print(f"\n   ID: {q.question_id}")
             print(f"   Text: {q.text[:60]}...")
             print(f"   Dimension: {q.dimension}")
@@ -133,10 +134,14 @@ class DatabaseUtils:
             print(f"   Lifecycle: {q.lifecycle_stage or 'N/A'}")
 
         # Check for null values
-        null_questions = [q for q in questions if not (q.category and q.question_type)]
-        if null_questions:
-            print(f"\n⚠️  Found {len(null_questions)} questions with null category or type:")
-            for q in null_questions[:5]:
+        null_questions = self.db.query(models.Question).filter(or_(
+            models.Question.category.is_(None), models.Question.category == '',
+            models.Question.question_type.is_(None), models.Question.question_type == ''
+        ))
+        null_count = null_questions.count()
+        if null_count:
+            print(f"\n⚠️  Found {null_count} questions with null category or type:")
+            for q in null_questions.order_by(models.Question.id).limit(5):
                 print(f"   • {q.question_id}: {q.text[:50]}...")
 
     def query_questions(self):
@@ -145,8 +150,7 @@ class DatabaseUtils:
         print("  QUESTION DISTRIBUTION ANALYSIS")
         print("="*60)
 
-        questions = self.db.query(models.Question).all()
-        total = len(questions)
+        total = self.db.query(func.count(models.Question.id)).scalar()
 
         print(f"\n📊 Total Questions: {total}")
 
@@ -155,14 +159,7 @@ class DatabaseUtils:
         print(f"{'Dimension':<40} {'Total':>8} {'CXO':>8} {'General':>8}")
         print("-" * 68)
 
-        dimension_stats = defaultdict(lambda: {'total': 0, 'cxo': 0, 'general': 0})
-
-        for q in questions:
-            dimension_stats[q.dimension]['total'] += 1
-            if q.question_type == 'CXO':
-                dimension_stats[q.dimension]['cxo'] += 1
-            elif q.question_type == 'General':
-                dimension_stats[q.dimension]['general'] += 1
+        dimension_stats = self._dimension_type_counts()
 
         for dim in sorted(dimension_stats.keys()):
             stats = dimension_stats[dim]
@@ -174,37 +171,46 @@ class DatabaseUtils:
         print(f"{'TOTAL':<40} {total:>8} {total_cxo:>8} {total_general:>8}")
 
         # Analyze by category
-        if any(q.category for q in questions):
+        category_counts = self._value_counts(models.Question.category)
+        if category_counts:
             print(f"\n📂 Questions by Category:")
-            category_counts = defaultdict(int)
-            for q in questions:
-                if q.category:
-                    category_counts[q.category] += 1
-
-            for cat in sorted(category_counts.keys()):
-                print(f"   {cat}: {category_counts[cat]}")
+            for cat, count in category_counts:
+                print(f"   {cat}: {count}")
 
         # Analyze by process
-        if any(q.process for q in questions):
+        process_counts = self._value_counts(models.Question.process)
+        if process_counts:
             print(f"\n⚙️  Questions by Process:")
-            process_counts = defaultdict(int)
-            for q in questions:
-                if q.process:
-                    process_counts[q.process] += 1
-
-            for proc in sorted(process_counts.keys()):
-                print(f"   {proc}: {process_counts[proc]}")
+            for proc, count in process_counts:
+                print(f"   {proc}: {count}")
 
         # Analyze by lifecycle stage
-        if any(q.lifecycle_stage for q in questions):
+        lifecycle_counts = self._value_counts(models.Question.lifecycle_stage)
+        if lifecycle_counts:
             print(f"\n🔄 Questions by Lifecycle Stage:")
-            lifecycle_counts = defaultdict(int)
-            for q in questions:
-                if q.lifecycle_stage:
-                    lifecycle_counts[q.lifecycle_stage] += 1
+            for stage, count in lifecycle_counts:
+                print(f"   {stage}: {count}")
 
-            for stage in sorted(lifecycle_counts.keys()):
-                print(f"   {stage}: {lifecycle_counts[stage]}")
+    def _dimension_type_counts(self):
+        """Total, CXO and General question counts per dimension, from one GROUP BY query"""
+        dimension_stats = defaultdict(lambda: {'total': 0, 'cxo': 0, 'general': 0})
+        rows = self.db.query(
+            models.Question.dimension, models.Question.question_type, func.count(models.Question.id)
+        ).group_by(models.Question.dimension, models.Question.question_type)
+
+        for dimension, question_type, count in rows:
+            dimension_stats[dimension]['total'] += count
+            if question_type == 'CXO':
+                dimension_stats[dimension]['cxo'] += count
+            elif question_type == 'General':
+                dimension_stats[dimension]['general'] += count
+        return dimension_stats
+
+    def _value_counts(self, column):
+        """Question counts for each non-empty value of a column, sorted by value"""
+        return sorted(self.db.query(column, func.count(models.Question.id)).filter(
+            column.isnot(None), column != ''
+        ).group_by(column).all())
 
     # ==================== User Management ====================
 
@@ -212,20 +218,19 @@ class DatabaseUtils:
         """Reset a user's password"""
         print(f"\nResetting password for user: {user_id}")
 
-        user = self.db.query(models.User).filter(
-            models.User.user_id == user_id
+        # Look the user up by user_id, falling back to the numeric ID, in one query
+        # (a user_id match sorts first so it still takes precedence)
+        condition = models.User.user_id == user_id
+        try:
+            condition = or_(condition, models.User.id == int(user_id))
+        except ValueError:
+            pass
+        user = self.db.query(models.User).filter(condition).order_by(
+            models.User.user_id != user_id
         ).first()
 
-        if not user:
+        if not user or user.user_id != user_id:
             print(f"❌ User '{user_id}' not found!")
-            # Try to find by ID
-            try:
-                user_pk = int(user_id)
-                user = self.db.query(models.User).filter(
-                    models.User.id == user_pk
-                ).first()
-            except ValueError:
-                pass
 
         if not user:
             print("❌ User not found!")
@@ -252,17 +257,19 @@ class DatabaseUtils:
         print("  ALL USERS")
         print("="*60)
 
-        users = self.db.query(models.User).all()
+        users = self.db.query(models.User)
+        total = users.count()
 
-        if not users:
+        if not total:
             print("\nNo users found.")
             return
 
-        print(f"\nTotal Users: {len(users)}\n")
+        print(f"\nTotal Users: {total}\n")
         print(f"{'ID':>4} {'User ID':<20} {'Username':<30} {'Type':<15} {'Customer ID':<12}")
         print("-" * 85)
 
-        for user in users:
+        # Stream rows from the server in batches rather than loading them all at once
+        for user in users.yield_per(500):
             print(f"{user.id:>4} {user.user_id:<20} {user.username:<30} "
                   f"{user.user_type.value:<15} {str(user.customer_id or 'N/A'):<12}")
 
@@ -272,15 +279,17 @@ class DatabaseUtils:
         print("  ALL CUSTOMERS")
         print("="*60)
 
-        customers = self.db.query(models.Customer).all()
+        customers = self.db.query(models.Customer)
+        total = customers.count()
 
-        if not customers:
+        if not total:
             print("\nNo customers found.")
             return
 
-        print(f"\nTotal Customers: {len(customers)}\n")
+        print(f"\nTotal Customers: {total}\n")
 
-        for customer in customers:
+        # Stream rows from the server in batches rather than loading them all at once
+        for customer in customers.yield_per(500):
             print(f"\nID: {customer.id}")
             print(f"Code: {customer.customer_code}")
             print(f"Name: {customer.name}")
@@ -294,17 +303,19 @@ class DatabaseUtils:
         print("  ALL SURVEYS")
         print("="*60)
 
-        surveys = self.db.query(models.Survey).all()
+        surveys = self.db.query(models.Survey)
+        total = surveys.count()
 
-        if not surveys:
+        if not total:
             print("\nNo surveys found.")
             return
 
-        print(f"\nTotal Surveys: {len(surveys)}\n")
+        print(f"\nTotal Surveys: {total}\n")
         print(f"{'ID':>4} {'Customer ID':>12} {'Status':<15} {'Submitted':<20} {'Created':<20}")
         print("-" * 75)
 
-        for survey in surveys:
+        # Stream rows from the server in batches rather than loading them all at once
+        for survey in surveys.yield_per(500):
             submitted = survey.submitted_at.strftime('%Y-%m-%d %H:%M') if survey.submitted_at else 'Not submitted'
             created = survey.created_at.strftime('%Y-%m-%d %H:%M') if survey.created_at else 'N/A'
             print(f"{survey.id:>4} {survey.customer_id:>12} {survey.status:<15} "
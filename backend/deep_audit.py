@@ -4,21 +4,78 @@ Deep Audit Script for LLM Configuration Implementation
 Checks database, models, schemas, providers, and integration
 """
 import sys
+import argparse
 import asyncio
+from functools import lru_cache
+import ast
+import textwrap
+import inspect as inspect_module
 from sqlalchemy import inspect, text
 from app.database import SessionLocal, engine
 from app import models, schemas
 import json
+import re
+
+# Horizontal rule framing each audit section's title
+RULE = "=" * 70
+
+# LLM config fields expected on the table, the model and the create/update schema
+LLM_CONFIG_FIELDS = (
+    'purpose', 'provider_type', 'model_name',
+    'api_url', 'api_key',
+    'aws_region', 'aws_access_key_id', 'aws_secret_access_key', 'aws_model_id', 'aws_thinking_mode',
+    'azure_endpoint', 'azure_api_key', 'azure_deployment_name', 'azure_api_version', 'azure_reasoning_effort'
+)
+# Table/model columns: the schema fields plus the row id and connection test status
+LLM_CONFIG_DB_FIELDS = ('id', 'status') + LLM_CONFIG_FIELDS
+
+# Source fragments expected in get_dimension_report, with a description for each
+REPORT_INTEGRATION_CHECKS = (
+    ('llm_config.status == "Success"', 'Status check'),
+    ('aws_thinking_mode', 'Thinking mode detection'),
+    ('timeout_seconds', 'Timeout configuration'),
+    ('asyncio.wait_for', 'Timeout wrapper'),
+)
+# All fragments in one alternation so the source is scanned in a single pass
+REPORT_INTEGRATION_PATTERN = re.compile(
+    "|".join(re.escape(check_str) for check_str, _ in REPORT_INTEGRATION_CHECKS)
+)
+
+# Identifiers expected in the provider factory, matched in one pass
+PROVIDER_FACTORY_PATTERN = re.compile(r"thinking_mode|reasoning_effort|getattr")
+
+# A temperature of exactly 1 set in the Bedrock request body (required with thinking)
+TEMPERATURE_ONE_PATTERN = re.compile(r"""["']temperature["']\]?\s*[=:]\s*1\b""")
+
+@lru_cache(maxsize=None)
+def get_inspector():
+    """
+    Shared schema inspector for the audits. An Inspector memoizes reflection
+    results (table names, columns), so repeated lookups skip the database.
+    """
+    return inspect(engine)
+
+def parse_function(func):
+    """
+    Parse a function's source once and collect what the provider checks query:
+    keyword arguments passed to calls (as (name, source) pairs) and attribute names.
+    """
+    tree = ast.parse(textwrap.dedent(inspect_module.getsource(func)))
+    keywords = set()
+    attributes = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            keywords.update((kw.arg, ast.unparse(kw.value)) for kw in node.keywords)
+        elif isinstance(node, ast.Attribute):
+            attributes.add(node.attr)
+    return keywords, attributes
 
 def check_database_schema():
     """Check database schema for LLM configs table"""
-    print("=" * 70)
-    print("  1. DATABASE SCHEMA AUDIT")
-    print("=" * 70)
+    print(f"{RULE}\n  1. DATABASE SCHEMA AUDIT\n{RULE}")
     
-    db = SessionLocal()
     try:
-        inspector = inspect(engine)
+        inspector = get_inspector()
         
         # Check if table exists
         if 'llm_configs' not in inspector.get_table_names():
@@ -26,25 +83,19 @@ def check_database_schema():
             return False
         
         # Get all columns
-        columns = {col['name']: col for col in inspector.get_columns('llm_configs')}
-        
-        required_columns = [
-            'id', 'purpose', 'provider_type', 'model_name', 'status',
-            'api_url', 'api_key',
-            'aws_region', 'aws_access_key_id', 'aws_secret_access_key', 'aws_model_id', 'aws_thinking_mode',
-            'azure_endpoint', 'azure_api_key', 'azure_deployment_name', 'azure_api_version', 'azure_reasoning_effort'
-        ]
+        column_types = {col['name']: col['type'] for col in inspector.get_columns('llm_configs')}
         
-        print(f"\nTable 'llm_configs' exists with {len(columns)} columns")
+        print(f"\nTable 'llm_configs' exists with {len(column_types)} columns")
         
+        lines = []
         missing = []
-        for col in required_columns:
-            if col in columns:
-                col_type = str(columns[col]['type'])
-                print(f"  ✓ {col}: {col_type}")
+        for col in LLM_CONFIG_DB_FIELDS:
+            if col in column_types:
+                lines.append(f"  ✓ {col}: {column_types[col]}")
             else:
-                print(f"  ✗ {col}: MISSING")
+                lines.append(f"  ✗ {col}: MISSING")
                 missing.append(col)
+        print("\n".join(lines))
         
         if missing:
             print(f"\n✗ Missing columns: {', '.join(missing)}")
@@ -56,40 +107,30 @@ def check_database_schema():
     except Exception as e:
         print(f"✗ Database schema check failed: {e}")
         return False
-    finally:
-        db.close()
 
 def check_sqlalchemy_model():
     """Check SQLAlchemy model definition"""
-    print("\n" + "=" * 70)
-    print("  2. SQLALCHEMY MODEL AUDIT")
-    print("=" * 70)
+    print(f"\n{RULE}\n  2. SQLALCHEMY MODEL AUDIT\n{RULE}")
     
     try:
         # Check LLMConfig model
         model = models.LLMConfig
         table = model.__table__
         
-        required_fields = [
-            'id', 'purpose', 'provider_type', 'model_name', 'status',
-            'api_url', 'api_key',
-            'aws_region', 'aws_access_key_id', 'aws_secret_access_key', 'aws_model_id', 'aws_thinking_mode',
-            'azure_endpoint', 'azure_api_key', 'azure_deployment_name', 'azure_api_version', 'azure_reasoning_effort'
-        ]
-        
         print(f"\nModel: {model.__name__}")
         print(f"Table: {table.name}")
         
-        model_columns = [col.name for col in table.columns]
+        model_columns = {col.name for col in table.columns}
+        lines = []
         missing = []
         
-        for field in required_fields:
+        for field in LLM_CONFIG_DB_FIELDS:
             if field in model_columns:
-                col = table.columns[field]
-                print(f"  ✓ {field}: {col.type}")
+                lines.append(f"  ✓ {field}: {table.columns[field].type}")
             else:
-                print(f"  ✗ {field}: MISSING")
+                lines.append(f"  ✗ {field}: MISSING")
                 missing.append(field)
+        print("\n".join(lines))
         
         if missing:
             print(f"\n✗ Missing model fields: {', '.join(missing)}")
@@ -106,33 +147,26 @@ def check_sqlalchemy_model():
 
 def check_pydantic_schema():
     """Check Pydantic schema definition"""
-    print("\n" + "=" * 70)
-    print("  3. PYDANTIC SCHEMA AUDIT")
-    print("=" * 70)
+    print(f"\n{RULE}\n  3. PYDANTIC SCHEMA AUDIT\n{RULE}")
     
     try:
         schema = schemas.LLMConfigBase
         
-        required_fields = [
-            'purpose', 'provider_type', 'model_name',
-            'api_url', 'api_key',
-            'aws_region', 'aws_access_key_id', 'aws_secret_access_key', 'aws_model_id', 'aws_thinking_mode',
-            'azure_endpoint', 'azure_api_key', 'azure_deployment_name', 'azure_api_version', 'azure_reasoning_effort'
-        ]
-        
         print(f"\nSchema: {schema.__name__}")
         print(f"Fields: {len(schema.model_fields)}")
         
+        lines = []
         missing = []
-        for field in required_fields:
+        for field in LLM_CONFIG_FIELDS:
             if field in schema.model_fields:
                 field_info = schema.model_fields[field]
                 field_type = field_info.annotation
                 default = field_info.default if hasattr(field_info, 'default') else 'None'
-                print(f"  ✓ {field}: {field_type} (default: {default})")
+                lines.append(f"  ✓ {field}: {field_type} (default: {default})")
             else:
-                print(f"  ✗ {field}: MISSING")
+                lines.append(f"  ✗ {field}: MISSING")
                 missing.append(field)
+        print("\n".join(lines))
         
         if missing:
             print(f"\n✗ Missing schema fields: {', '.join(missing)}")
@@ -149,16 +183,13 @@ def check_pydantic_schema():
 
 def check_provider_implementation():
     """Check provider implementation"""
-    print("\n" + "=" * 70)
-    print("  4. PROVIDER IMPLEMENTATION AUDIT")
-    print("=" * 70)
+    print(f"\n{RULE}\n  4. PROVIDER IMPLEMENTATION AUDIT\n{RULE}")
     
     success = True
     
     # Check AWSBedrockProvider
     try:
         from app.llm_providers import AWSBedrockProvider
-        import inspect as inspect_module
         
         # Check __init__ signature
         init_sig = inspect_module.signature(AWSBedrockProvider.__init__)
@@ -171,9 +202,12 @@ def check_provider_implementation():
             success = False
         
         # Check _prepare_request_body for temperature logic
+        # (the temperature has to be set after thinking_mode is consulted, so
+        # both searches start from where thinking_mode first appears)
         source = inspect_module.getsource(AWSBedrockProvider._prepare_request_body)
-        if 'temperature' in source and 'thinking_mode' in source:
-            if 'temperature' in source and '1' in source and 'thinking' in source.lower():
+        thinking_pos = source.find('thinking_mode')
+        if thinking_pos != -1 and source.find('temperature', thinking_pos) != -1:
+            if TEMPERATURE_ONE_PATTERN.search(source, thinking_pos):
                 print("✓ AWSBedrockProvider._prepare_request_body has temperature=1 logic for thinking mode")
             else:
                 print("⚠ AWSBedrockProvider._prepare_request_body may have temperature logic issues")
@@ -181,16 +215,17 @@ def check_provider_implementation():
             print("✗ AWSBedrockProvider._prepare_request_body missing temperature/thinking logic")
             success = False
         
-        # Check _get_client for timeout
-        source = inspect_module.getsource(AWSBedrockProvider._get_client)
-        if 'read_timeout' in source and 'thinking_mode' in source:
+        # Check _get_client for timeout (structurally: a read_timeout= keyword
+        # argument and a self.thinking_mode reference)
+        keywords, attributes = parse_function(AWSBedrockProvider._get_client)
+        if any(name == 'read_timeout' for name, _ in keywords) and 'thinking_mode' in attributes:
             print("✓ AWSBedrockProvider._get_client has dynamic timeout for thinking mode")
         else:
             print("✗ AWSBedrockProvider._get_client missing dynamic timeout")
             success = False
         
         # Check verify=False
-        if 'verify=False' in source:
+        if ('verify', 'False') in keywords:
             print("✓ AWSBedrockProvider._get_client has verify=False")
         else:
             print("⚠ AWSBedrockProvider._get_client may not have verify=False")
@@ -204,7 +239,6 @@ def check_provider_implementation():
     # Check AzureOpenAIProvider
     try:
         from app.llm_providers import AzureOpenAIProvider
-        import inspect as inspect_module
         
         init_sig = inspect_module.signature(AzureOpenAIProvider.__init__)
         params = list(init_sig.parameters.keys())
@@ -219,19 +253,19 @@ def check_provider_implementation():
         print(f"✗ AzureOpenAIProvider check failed: {e}")
         success = False
     
-    # Check get_llm_provider factory
+    # Check provider factory (get_llm_provider caches what _create_llm_provider builds)
     try:
-        from app.llm_providers import get_llm_provider
-        import inspect as inspect_module
+        from app.llm_providers import _create_llm_provider
         
-        source = inspect_module.getsource(get_llm_provider)
-        if 'thinking_mode' in source and 'getattr' in source:
+        source = inspect_module.getsource(_create_llm_provider)
+        found = {match.group() for match in PROVIDER_FACTORY_PATTERN.finditer(source)}
+        if {'thinking_mode', 'getattr'} <= found:
             print("✓ get_llm_provider passes thinking_mode to AWSBedrockProvider")
         else:
             print("✗ get_llm_provider may not pass thinking_mode correctly")
             success = False
         
-        if 'reasoning_effort' in source:
+        if 'reasoning_effort' in found:
             print("✓ get_llm_provider passes reasoning_effort to AzureOpenAIProvider")
         else:
             print("⚠ get_llm_provider may not pass reasoning_effort")
@@ -244,13 +278,29 @@ def check_provider_implementation():
 
 def check_database_data():
     """Check actual database data"""
-    print("\n" + "=" * 70)
-    print("  5. DATABASE DATA AUDIT")
-    print("=" * 70)
+    print(f"\n{RULE}\n  5. DATABASE DATA AUDIT\n{RULE}")
     
     db = SessionLocal()
     try:
-        configs = db.query(models.LLMConfig).all()
+        # Skip straight away if the schema audit's table is missing, instead of
+        # letting the query fail and unwinding through the error handler
+        if 'llm_configs' not in get_inspector().get_table_names():
+            print("\n✗ Table 'llm_configs' does not exist - skipping data check")
+            return False
+        
+        # Only load the columns reported below rather than full ORM objects
+        # (which would also pull the stored credentials)
+        configs = db.query(models.LLMConfig).with_entities(
+            models.LLMConfig.purpose,
+            models.LLMConfig.provider_type,
+            models.LLMConfig.status,
+            models.LLMConfig.aws_model_id,
+            models.LLMConfig.aws_region,
+            models.LLMConfig.aws_thinking_mode,
+            models.LLMConfig.azure_deployment_name,
+            models.LLMConfig.azure_endpoint,
+            models.LLMConfig.azure_reasoning_effort
+        ).all()
         print(f"\nFound {len(configs)} LLM configs in database")
         
         if len(configs) == 0:
@@ -289,26 +339,17 @@ def check_database_data():
 
 def check_report_integration():
     """Check report generation integration"""
-    print("\n" + "=" * 70)
-    print("  6. REPORT GENERATION INTEGRATION AUDIT")
-    print("=" * 70)
+    print(f"\n{RULE}\n  6. REPORT GENERATION INTEGRATION AUDIT\n{RULE}")
     
     try:
         from app.routers import reports
-        import inspect as inspect_module
         
         # Check get_dimension_report
         source = inspect_module.getsource(reports.get_dimension_report)
+        found = {match.group() for match in REPORT_INTEGRATION_PATTERN.finditer(source)}
         
-        checks = [
-            ('llm_config.status == "Success"', 'Status check'),
-            ('aws_thinking_mode', 'Thinking mode detection'),
-            ('timeout_seconds', 'Timeout configuration'),
-            ('asyncio.wait_for', 'Timeout wrapper'),
-        ]
-        
-        for check_str, description in checks:
-            if check_str in source:
+        for check_str, description in REPORT_INTEGRATION_CHECKS:
+            if check_str in found:
                 print(f"✓ {description}: Present")
             else:
                 print(f"✗ {description}: Missing")
@@ -323,41 +364,55 @@ def check_report_integration():
         traceback.print_exc()
         return False
 
+AUDITS = (
+    ("Database Schema", check_database_schema),
+    ("SQLAlchemy Model", check_sqlalchemy_model),
+    ("Pydantic Schema", check_pydantic_schema),
+    ("Provider Implementation", check_provider_implementation),
+    ("Database Data", check_database_data),
+    ("Report Integration", check_report_integration),
+)
+
+def run_audits(audits, fail_fast=False):
+    """Run the audits in order; with fail_fast, stop at the first failure."""
+    results = []
+    for name, check in audits:
+        result = check()
+        results.append((name, result))
+        if fail_fast and not result:
+            break
+    return results
+
 def main():
     """Run all audits"""
-    print("\n" + "=" * 70)
-    print("  DEEP AUDIT: LLM CONFIGURATION IMPLEMENTATION")
-    print("=" * 70)
-    print()
-    
-    results = []
-    
-    results.append(("Database Schema", check_database_schema()))
-    results.append(("SQLAlchemy Model", check_sqlalchemy_model()))
-    results.append(("Pydantic Schema", check_pydantic_schema()))
-    results.append(("Provider Implementation", check_provider_implementation()))
-    results.append(("Database Data", check_database_data()))
-    results.append(("Report Integration", check_report_integration()))
+    parser = argparse.ArgumentParser(description="Deep audit of the LLM configuration implementation")
+    parser.add_argument('--fail-fast', action='store_true',
+                        help='Stop at the first failing audit')
+    args = parser.parse_args()
+
+    sys.stdout.write(f"\n{RULE}\n  DEEP AUDIT: LLM CONFIGURATION IMPLEMENTATION\n{RULE}\n\n")
     
-    print("\n" + "=" * 70)
-    print("  AUDIT SUMMARY")
-    print("=" * 70)
+    results = run_audits(AUDITS, fail_fast=args.fail_fast)
     
     passed = sum(1 for _, result in results if result)
     total = len(results)
     
+    # Build the summary and write it out in one go
+    summary = [f"\n{RULE}", "  AUDIT SUMMARY", RULE]
     for name, result in results:
         status = "✓ PASS" if result else "✗ FAIL"
-        print(f"  {status}: {name}")
+        summary.append(f"  {status}: {name}")
+    for name, _ in AUDITS[len(results):]:
+        summary.append(f"  - SKIP: {name}")
     
-    print(f"\n  Results: {passed}/{total} checks passed")
+    summary.append(f"\n  Results: {passed}/{total} checks passed")
     
     if passed == total:
-        print("\n✓ ALL CHECKS PASSED - System is properly configured!")
-        sys.exit(0)
+        summary.append("\n✓ ALL CHECKS PASSED - System is properly configured!")
     else:
-        print(f"\n✗ {total - passed} CHECK(S) FAILED - Review issues above")
-        sys.exit(1)
+        summary.append(f"\n✗ {total - passed} CHECK(S) FAILED - Review issues above")
+    sys.stdout.write("\n".join(summary) + "\n")
+    sys.exit(0 if passed == total else 1)
 
 if __name__ == "__main__":
     main()
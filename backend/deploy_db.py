@@ -20,6 +20,7 @@ Usage:
     python deploy_db.py --migrate llm_providers
     python deploy_db.py --migrate questions_fields
     python deploy_db.py --migrate user_submissions
+    python deploy_db.py --migrate response_unique
 
 Available Migrations:
     - password           : Add password column to users table
@@ -27,6 +28,7 @@ Available Migrations:
     - llm_providers      : Add multi-provider LLM support (LOCAL, BEDROCK, AZURE)
     - questions_fields   : Add process and lifecycle_stage columns to questions table
     - user_submissions   : Create user_survey_submissions table
+    - response_unique    : Add unique (survey_id, user_id, question_id) to survey_responses
 """
 
 import sys
@@ -181,8 +183,8 @@ class DatabaseDeployment:
                 if not questions_file:
                     raise FileNotFoundError("questions.json not found in any expected location")
                 
-                with open(questions_file, 'r', encoding='utf-8') as f:
-                    questions_data = json.load(f)
+                with open(questions_file, 'rb') as f:
+                    questions_data = json.loads(f.read())
 
                 logger.info(f"Found {len(questions_data)} questions in file.")
 
@@ -403,6 +405,33 @@ class DatabaseDeployment:
             logger.error(f"✗ Migration failed: {e}")
             return False
 
+    def migrate_response_unique(self):
+        """Add unique constraint on survey_responses(survey_id, user_id, question_id)"""
+        logger.info("\n[Migration: response_unique] Adding unique constraint to survey_responses...")
+
+        if not self.table_exists('survey_responses'):
+            logger.info("⚠ Table 'survey_responses' does not exist yet.")
+            return True
+
+        constraints = self.inspector.get_unique_constraints('survey_responses')
+        if any(c['name'] == 'uq_survey_user_question' for c in constraints):
+            logger.info("⚠ Constraint 'uq_survey_user_question' already exists.")
+            return True
+
+        try:
+            if not self.execute_sql("""
+                ALTER TABLE survey_responses
+                ADD CONSTRAINT uq_survey_user_question UNIQUE (survey_id, user_id, question_id)
+            """):
+                logger.error("  Remove duplicate responses before re-running this migration.")
+                return False
+
+            logger.info("✓ Unique constraint added successfully!")
+            return True
+        except Exception as e:
+            logger.error(f"✗ Migration failed: {e}")
+            return False
+
     def run_all_migrations(self):
         """Run all migrations in order"""
         logger.info("\n" + "=" * 70)
@@ -415,6 +444,7 @@ class DatabaseDeployment:
             ("llm_providers", self.migrate_llm_providers),
             ("questions_fields", self.migrate_questions_fields),
             ("user_submissions", self.migrate_user_submissions),
+            ("response_unique", self.migrate_response_unique),
         ]
 
         success_count = 0
@@ -481,7 +511,8 @@ def main():
     parser.add_argument('--migrate-only', action='store_true',
                         help='Run all migrations only')
     parser.add_argument('--migrate', type=str,
-                        choices=['password', 'llm_model', 'llm_providers', 'questions_fields', 'user_submissions'],
+                        choices=['password', 'llm_model', 'llm_providers', 'questions_fields', 'user_submissions',
+                                 'response_unique'],
                         help='Run a specific migration')
 
     args = parser.parse_args()
@@ -504,6 +535,7 @@ def main():
                     'llm_providers': deployment.migrate_llm_providers,
                     'questions_fields': deployment.migrate_questions_fields,
                     'user_submissions': deployment.migrate_user_submissions,
+                    'response_unique': deployment.migrate_response_unique,
                 }
                 migration_map[args.migrate]()
                 deployment.print_summary()
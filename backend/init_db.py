@@ -43,8 +43,8 @@ def init_database():
         if question_count == 0:
             print("\nLoading questions from questions.json...")
             try:
-                with open('questions.json', 'r', encoding='utf-8') as f:
-                    questions_data = json.load(f)
+                with open('questions.json', 'rb') as f:
+                    questions_data = json.loads(f.read())
                 
                 print(f"Found {len(questions_data)} questions in file.")
                 
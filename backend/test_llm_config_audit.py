@@ -4,10 +4,13 @@ Deep audit script to verify LLM configuration implementation
 """
 import sys
 from sqlalchemy import inspect, text
-from app.database import SessionLocal, engine
+from app.database import engine
 from app import models, schemas
 import json
 
+# Columns added for the reasoning effort / thinking mode options
+REQUIRED_COLUMNS = ('azure_reasoning_effort', 'aws_thinking_mode')
+
 def audit_database_schema():
     """Check database schema matches models"""
     print("=" * 70)
@@ -15,17 +18,15 @@ def audit_database_schema():
     print("=" * 70)
     
     inspector = inspect(engine)
-    columns = {col['name']: col for col in inspector.get_columns('llm_configs')}
-    
-    required_columns = [
-        'azure_reasoning_effort',
-        'aws_thinking_mode'
-    ]
+    if 'llm_configs' not in inspector.get_table_names():
+        print("✗ Table 'llm_configs' does not exist!")
+        return False
+    column_types = {col['name']: col['type'] for col in inspector.get_columns('llm_configs')}
     
     all_ok = True
-    for col_name in required_columns:
-        if col_name in columns:
-            col_type = str(columns[col_name]['type'])
+    for col_name in REQUIRED_COLUMNS:
+        if col_name in column_types:
+            col_type = str(column_types[col_name])
             print(f"✓ {col_name}: {col_type}")
         else:
             print(f"✗ {col_name}: MISSING!")
@@ -120,7 +121,6 @@ def test_config_creation():
     print("  CONFIG CREATION TEST")
     print("=" * 70)
     
-    db = SessionLocal()
     try:
         # Test creating config with reasoning_effort
         test_config = models.LLMConfig(
@@ -152,8 +152,6 @@ def test_config_creation():
     except Exception as e:
         print(f"✗ Error creating test config: {e}")
         return False
-    finally:
-        db.close()
 
 def main():
     """Run all audits"""